@@ -0,0 +1,73 @@
+"""
+Measures CorpusIngestor throughput for an increasing number of worker
+processes, with an embedder and vector store that do no work, so the numbers
+reflect loading and chunking only.
+
+    python benchmarks/corpus_ingestion_benchmark.py --documents 400 --processes 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict, List
+from docqa_bench import BaseEmbedder, BaseVectorStore, CorpusIngestor, SimpleChunker, TextFileDocument
+from splitter_benchmark import make_text
+
+
+class NullEmbedder(BaseEmbedder):
+    async def embed(self, text: str) -> List[float]:
+        return [0.0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [[0.0] for _ in texts]
+
+
+class NullVectorStore(BaseVectorStore):
+    def __init__(self):
+        self.size = 0
+
+    async def add(self, id: str, vector: List[float], metadata: dict):
+        self.size += 1
+
+    async def search(self, query_vector: List[float], k: int) -> List[Dict]:
+        return []
+
+    async def count(self) -> int:
+        return self.size
+
+
+async def run(documents: List[TextFileDocument], processes: int) -> float:
+    ingestor = CorpusIngestor(SimpleChunker(chunk_size=200, chunk_overlap=40),
+                              NullEmbedder(), NullVectorStore(), processes=processes)
+    start = time.perf_counter()
+    await ingestor.ingest(documents)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark corpus ingestion")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--size", type=int, default=200_000, help="Characters per document")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        documents = []
+        for i in range(args.documents):
+            path = os.path.join(directory, f"document_{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(make_text(args.size, seed=i))
+            documents.append(TextFileDocument(path))
+
+        total = args.documents * args.size / 1e6
+        baseline = None
+        for processes in args.processes:
+            seconds = asyncio.run(run(documents, processes))
+            baseline = baseline or seconds
+            print(f"processes={processes}: {seconds:.2f}s, {total / seconds:.1f} MB/s, "
+                  f"speedup {baseline / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Load-tests the framework itself with the offline backends: a hashing
+embedder, extractive generators with simulated API latency and an in-memory
+vector store, so the timings reflect ingestion, search and scheduling
+overhead rather than a remote API.
+
+    python benchmarks/offline_pipeline_benchmark.py --documents 50 --latency 0.05 --jitter 0.05
+"""
+import argparse
+import asyncio
+import time
+from docqa_bench import (
+    CorpusBenchmark,
+    ExtractiveAnswerGenerator,
+    ExtractiveQuestionGenerator,
+    F1Evaluator,
+    HashingEmbedder,
+    NumpyVectorStore,
+    PreprocessedDocument,
+    SimpleChunker,
+)
+from splitter_benchmark import make_text
+
+
+async def run(args) -> None:
+    documents = [PreprocessedDocument(make_text(args.size, seed=i)) for i in range(args.documents)]
+    benchmark = CorpusBenchmark(
+        documents,
+        SimpleChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_size // 5),
+        HashingEmbedder(dimension=args.dimension, latency=args.latency, jitter=args.jitter, seed=0),
+        NumpyVectorStore(),
+        ExtractiveQuestionGenerator(latency=args.latency, jitter=args.jitter, seed=1),
+        ExtractiveAnswerGenerator(latency=args.latency, jitter=args.jitter, seed=2),
+        F1Evaluator(),
+        max_concurrency=args.concurrency,
+        questions_per_document=args.questions,
+        processes=args.processes,
+    )
+
+    start = time.perf_counter()
+    num_chunks = await benchmark.ingest()
+    ingest_seconds = time.perf_counter() - start
+    print(f"ingested {num_chunks} chunks in {ingest_seconds:.2f}s "
+          f"({num_chunks / ingest_seconds:.0f} chunks/s)")
+
+    start = time.perf_counter()
+    output = await benchmark.run_retrieval(k=args.k, num_chunks=args.questions * args.documents,
+                                           ingest=False)
+    retrieval_seconds = time.perf_counter() - start
+    print(f"retrieval-only: {len(output['results'])} questions in {retrieval_seconds:.2f}s, "
+          f"recall@{args.k} {output['metrics']['recall@k']:.3f}")
+
+    start = time.perf_counter()
+    results = await benchmark.run()
+    run_seconds = time.perf_counter() - start
+    summary = CorpusBenchmark.summarize(results)["aggregate"]
+    print(f"full run: {len(results)} questions in {run_seconds:.2f}s "
+          f"({len(results) / run_seconds:.1f} questions/s), mean F1 {summary['mean_score']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the pipeline with offline backends")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--size", type=int, default=50_000, help="Characters per document")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--questions", type=int, default=5, help="Questions per document")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Simulated extra seconds per call")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
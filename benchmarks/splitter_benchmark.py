@@ -0,0 +1,65 @@
+"""
+Compares the built-in RecursiveTextSplitter with LangChain's
+RecursiveCharacterTextSplitter: checks that both produce identical chunks and
+reports the time each takes. Requires the dev dependencies (langchain).
+
+    python benchmarks/splitter_benchmark.py --size 5000000
+"""
+import argparse
+import random
+import time
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from docqa_bench.chunkers.recursive_splitter import RecursiveTextSplitter
+
+WORDS = ["document", "question", "answer", "chunk", "embedding", "vector", "a", "the", "of"]
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+    while length < size:
+        lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40)))
+                 for _ in range(rng.randint(1, 6))]
+        paragraph = "\n".join(lines)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+
+def timed(split, text: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = split(text)
+        best = min(best, time.perf_counter() - start)
+    return chunks, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text splitters")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Text size in characters")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_text(args.size)
+    langchain_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, length_function=len,
+        separators=["\n\n", "\n", " ", ""])
+    native_splitter = RecursiveTextSplitter(chunk_size=args.chunk_size,
+                                            chunk_overlap=args.chunk_overlap)
+
+    expected, langchain_seconds = timed(langchain_splitter.split_text, text, args.repeat)
+    chunks, native_seconds = timed(native_splitter.split_text, text, args.repeat)
+    _, spans_seconds = timed(native_splitter.split_spans, text, args.repeat)
+
+    print(f"chunks: {len(chunks)}, identical: {chunks == expected}")
+    print(f"langchain:           {langchain_seconds:.3f}s")
+    print(f"native split_text:   {native_seconds:.3f}s ({langchain_seconds / native_seconds:.1f}x)")
+    print(f"native split_spans:  {spans_seconds:.3f}s ({langchain_seconds / spans_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
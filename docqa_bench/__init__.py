@@ -1,4 +1,5 @@
 from .core.document import BaseDocument, PreprocessedDocument
+from .document_types.text_document import TextFileDocument
 from .core.chunker import BaseChunker
 from .core.embedder import BaseEmbedder
 from .core.vector_store import BaseVectorStore
@@ -7,18 +8,48 @@ from .core.answer_generator import BaseAnswerGenerator
 from .core.evaluator import BaseEvaluator
 
 from .chunkers.simple_chunker import SimpleChunker
-from .embedders.openai_embedder import OpenAIEmbedder
+from .chunkers.recursive_splitter import RecursiveTextSplitter
+from .embedders.openai_embedder import OpenAIEmbedder, AsyncOpenAIEmbedder
+from .embedders.cached_embedder import CachedEmbedder
+from .embedders.hashing_embedder import HashingEmbedder
 from .vector_stores.chroma_store import ChromaStore
-from .models.openai_model import OpenAIQuestionGenerator, OpenAIAnswerGenerator
+from .vector_stores.numpy_store import NumpyVectorStore
+from .vector_stores.ivf_store import IVFVectorStore
+from .vector_stores.hybrid_store import HybridStore
+from .models.openai_model import (
+    OpenAIQuestionGenerator, OpenAIAnswerGenerator,
+    AsyncOpenAIQuestionGenerator, AsyncOpenAIAnswerGenerator
+)
+from .clients.openai_client import AsyncClientConfig
+from .clients.rate_limiter import RateLimiter, RetryPolicy
+from .models.extractive_model import ExtractiveQuestionGenerator, ExtractiveAnswerGenerator
+from .models.cached_model import (
+    ResponseCache, CachedQuestionGenerator, CachedAnswerGenerator
+)
 from .metrics.f1_score import F1Evaluator
+from .metrics.semantic_similarity import SemanticSimilarityEvaluator
+from .storage.reference_answers import ReferenceAnswerStore
+from .storage.embedding_matrix import (
+    EmbeddingMatrix, EmbeddingMatrixWriter, embed_to_matrix
+)
+from .ingestion import CorpusIngestor
 from .benchmark import Benchmark
+from .corpus_benchmark import CorpusBenchmark
+from .sweep import Sweep
 
 __all__ = [
     'BaseDocument', 'BaseChunker', 'BaseEmbedder', 'BaseVectorStore',
     'BaseQuestionGenerator', 'BaseAnswerGenerator', 'BaseEvaluator',
-    'Benchmark', 'PreprocessedDocument', 'SimpleChunker', 'OpenAIEmbedder',
+    'Benchmark', 'PreprocessedDocument', 'SimpleChunker', 'RecursiveTextSplitter', 'OpenAIEmbedder',
     'ChromaStore', 'OpenAIQuestionGenerator', 'OpenAIAnswerGenerator',
-    'F1Evaluator'
+    'F1Evaluator', 'CachedEmbedder', 'ResponseCache', 'CachedQuestionGenerator',
+    'CachedAnswerGenerator', 'ReferenceAnswerStore', 'AsyncClientConfig',
+    'AsyncOpenAIEmbedder', 'AsyncOpenAIQuestionGenerator', 'AsyncOpenAIAnswerGenerator',
+    'RateLimiter', 'RetryPolicy', 'NumpyVectorStore', 'IVFVectorStore',
+    'EmbeddingMatrix', 'EmbeddingMatrixWriter', 'embed_to_matrix', 'TextFileDocument',
+    'CorpusIngestor', 'CorpusBenchmark', 'SemanticSimilarityEvaluator',
+    'HybridStore', 'HashingEmbedder', 'ExtractiveQuestionGenerator',
+    'ExtractiveAnswerGenerator', 'Sweep'
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,172 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]
+
+
+class RecursiveTextSplitter:
+    """
+    Dependency-free recursive character splitter.
+
+    Produces the same chunks as LangChain's ``RecursiveCharacterTextSplitter``
+    with its defaults (separators kept at the start of each piece, whitespace
+    stripped), but works on (start, end) offsets into the original text so
+    pieces are only copied when a chunk is materialised. ``length_function``
+    can be any callable, e.g. a tokenizer's length for token-based chunk sizes.
+    """
+
+    def __init__(self,
+                 chunk_size: int = 1000,
+                 chunk_overlap: int = 200,
+                 separators: Optional[Sequence[str]] = None,
+                 length_function: Callable[[str], int] = len,
+                 strip_whitespace: bool = True):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                             f"({chunk_size}), should be smaller.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or ["\n\n", "\n", " ", ""])
+        self.length_function = length_function
+        self.strip_whitespace = strip_whitespace
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_spans(self, text: str) -> List[Span]:
+        """
+        Split text into chunks.
+
+        :param text: The text to split.
+        :return: The (start, end) offset of every chunk in ``text``.
+        """
+        chunks: List[Span] = []
+        self._split(text, 0, len(text), self.separators, chunks)
+        return chunks
+
+    def split_prefix_spans(self, text: str) -> Tuple[List[Span], int]:
+        """
+        Split the beginning of a text whose continuation is not known yet.
+
+        Only the chunks that split_spans returns for every continuation of
+        ``text`` are returned. The rest is split by calling this again, or
+        split_spans at the end, on the text from the returned offset on, so
+        streamed chunks are exactly those of splitting the whole text at once.
+        Until ``text`` contains the first separator, the separator the whole
+        text is split on is unknown and nothing can be returned.
+
+        :param text: The beginning of the text.
+        :return: The (start, end) offsets of the final chunks in ``text``, and
+            the offset the remaining text has to be split from.
+        """
+        separator, remaining = self.separators[0], self.separators[1:]
+        if separator == "" or text.find(separator) == -1:
+            return [], 0
+        # The last piece may be continued by the text that follows
+        pieces = self._pieces(text, 0, len(text), separator)[:-1]
+        chunks: List[Span] = []
+        resume = 0
+        good: List[Span] = []
+        good_lengths: List[int] = []
+        for piece, length in zip(pieces, self._lengths(text, pieces)):
+            if length < self.chunk_size:
+                good.append(piece)
+                good_lengths.append(length)
+                continue
+            if good:
+                self._merge(text, good, good_lengths, chunks)
+                good, good_lengths = [], []
+            if remaining:
+                self._split(text, piece[0], piece[1], remaining, chunks)
+            else:
+                chunks.append(piece)
+            resume = piece[1]
+        if good:
+            # Merging is greedy, so it resumes identically from its current first piece
+            first = self._merge(text, good, good_lengths, chunks, flush=False)
+            resume = good[first][0]
+        return chunks, resume
+
+    def _lengths(self, text: str, pieces: List[Span]) -> List[int]:
+        if self.length_function is len:
+            return [end - start for start, end in pieces]
+        return [self.length_function(text[start:end]) for start, end in pieces]
+
+    def _split(self, text: str, start: int, end: int, separators: List[str],
+               chunks: List[Span]):
+        # Use the first separator that occurs in this piece of text
+        separator = separators[-1]
+        remaining: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1:]
+                break
+
+        pieces = self._pieces(text, start, end, separator)
+        good: List[Span] = []
+        good_lengths: List[int] = []
+        for piece, length in zip(pieces, self._lengths(text, pieces)):
+            if length < self.chunk_size:
+                good.append(piece)
+                good_lengths.append(length)
+                continue
+            if good:
+                self._merge(text, good, good_lengths, chunks)
+                good, good_lengths = [], []
+            if remaining:
+                self._split(text, piece[0], piece[1], remaining, chunks)
+            else:
+                chunks.append(piece)
+        if good:
+            self._merge(text, good, good_lengths, chunks)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> List[Span]:
+        # Every piece after the first starts with the separator it was split on
+        if separator == "":
+            return [(i, i + 1) for i in range(start, end)]
+        pieces = []
+        position = start
+        # str.split runs in C; only the piece lengths are used to derive offsets
+        for i, part in enumerate(text[start:end].split(separator)):
+            piece_start = position
+            position += len(part) if i == 0 else len(separator) + len(part)
+            if position > piece_start:
+                pieces.append((piece_start, position))
+        return pieces
+
+    def _merge(self, text: str, pieces: List[Span], lengths: List[int], chunks: List[Span],
+               flush: bool = True) -> int:
+        # Greedily combine consecutive pieces into chunks of at most chunk_size,
+        # starting each new chunk with up to chunk_overlap of the previous one.
+        # Without flush, the pieces of the last, unfinished chunk are not
+        # emitted; the index of its first piece is returned.
+        # Pieces are joined with an empty separator, which a custom length
+        # function may still count
+        separator_length = 0 if self.length_function is len else self.length_function("")
+        first = 0
+        total = 0
+        for i, length in enumerate(lengths):
+            if total + length + separator_length > self.chunk_size and i > first:
+                self._emit(text, pieces[first][0], pieces[i - 1][1], chunks)
+                while total > self.chunk_overlap or (
+                        total + length + (separator_length if i > first else 0) > self.chunk_size
+                        and total > 0):
+                    total -= lengths[first] + (separator_length if i - first > 1 else 0)
+                    first += 1
+            total += length + (separator_length if i > first else 0)
+        if flush and first < len(pieces):
+            self._emit(text, pieces[first][0], pieces[-1][1], chunks)
+        return first
+
+    def _emit(self, text: str, start: int, end: int, chunks: List[Span]):
+        if self.strip_whitespace:
+            chunk = text[start:end]
+            stripped = chunk.lstrip()
+            start += len(chunk) - len(stripped)
+            end = start + len(stripped.rstrip())
+        if start < end:
+            chunks.append((start, end))
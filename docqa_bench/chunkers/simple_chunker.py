@@ -1,21 +1,50 @@
-from typing import List
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Tuple
 from docqa_bench.core.chunker import BaseChunker
+from docqa_bench.chunkers.recursive_splitter import RecursiveTextSplitter
 
 class SimpleChunker(BaseChunker):
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 stream_window: Optional[int] = None,
+                 length_function: Callable[[str], int] = len):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_function = length_function
+        # Amount of text buffered by iter_chunks before it splits
+        self.stream_window = stream_window or max(64 * chunk_size, 1 << 16)
+        self.text_splitter = RecursiveTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
+            length_function=length_function,
             separators=["\n\n", "\n", " ", ""]
         )
 
     async def chunk(self, text: str) -> List[str]:
-        # LangChain's text splitter is not async, so we'll run it in a separate thread
+        # Splitting is CPU-bound, so we'll run it in a separate thread
         return await self._split_text(text)
 
+    async def chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        return await asyncio.to_thread(self.text_splitter.split_spans, text)
+
+    async def iter_chunks(self, blocks: AsyncIterable[str]) -> AsyncIterator[str]:
+        # Split a bounded window at a time, emitting only the chunks that the
+        # text after the window cannot change, so the stream yields exactly the
+        # chunks of chunk(). Text without paragraph breaks is buffered whole.
+        buffer = ""
+        limit = self.stream_window
+        async for block in blocks:
+            buffer += block
+            if len(buffer) < limit:
+                continue
+            spans, resume = await asyncio.to_thread(self.text_splitter.split_prefix_spans, buffer)
+            for start, end in spans:
+                yield buffer[start:end]
+            buffer = buffer[resume:]
+            limit = len(buffer) + self.stream_window
+        if buffer:
+            for chunk in await self._split_text(buffer):
+                yield chunk
+
     async def _split_text(self, text: str) -> List[str]:
         # This method runs the synchronous text_splitter in a separate thread
-        import asyncio
-        return await asyncio.to_thread(self.text_splitter.split_text, text)
\ No newline at end of file
+        return await asyncio.to_thread(self.text_splitter.split_text, text)
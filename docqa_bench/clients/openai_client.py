@@ -0,0 +1,51 @@
+import asyncio
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+
+@dataclass(frozen=True)
+class AsyncClientConfig:
+    """
+    Connection settings for a pooled AsyncOpenAI client.
+
+    Components constructed with equal configs share one client and therefore
+    one HTTP connection pool.
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    base_url: Optional[str] = None
+    # Kept out of the repr so that logged configs do not leak the key
+    api_key: Optional[str] = field(default=None, repr=False)
+
+
+# httpx connection pools are bound to the event loop that created them, so
+# clients are shared per running loop.
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_client(config: Optional[AsyncClientConfig] = None) -> AsyncOpenAI:
+    """
+    Return the AsyncOpenAI client shared by all components using ``config``.
+
+    Must be called from a running event loop.
+
+    :param config: The connection settings. Defaults to AsyncClientConfig().
+    :return: The shared client for the current event loop.
+    """
+    config = config or AsyncClientConfig()
+    clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+    if config not in clients:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ))
+        clients[config] = AsyncOpenAI(api_key=config.api_key,
+                                      base_url=config.base_url,
+                                      http_client=http_client)
+    return clients[config]
@@ -0,0 +1,207 @@
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Union
+import openai
+from docqa_bench.telemetry import record_usage
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: Union[str, List[str]]) -> int:
+    """
+    Cheap token estimate (about four characters per token) used for budgeting.
+    """
+    if isinstance(text, str):
+        return len(text) // 4 + 1
+    return sum(estimate_tokens(item) for item in text)
+
+
+class RateLimiter:
+    """
+    Adaptive token-bucket limiter with requests-per-minute and tokens-per-minute
+    budgets.
+
+    Both buckets refill continuously. When the API reports a rate limit, all
+    callers are paused until the Retry-After time has elapsed and the
+    effective rate is halved, then recovers gradually on successful calls.
+    """
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 min_rate_scale: float = 0.1):
+        """
+        :param requests_per_minute: Request budget, or None for no limit.
+        :param tokens_per_minute: Token budget, or None for no limit.
+        :param min_rate_scale: Lower bound for the adaptive rate reduction.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_rate_scale = min_rate_scale
+        self.rate_scale = 1.0
+        self._requests = requests_per_minute or 0.0
+        self._tokens = tokens_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0):
+        """
+        Wait until one request and ``tokens`` tokens fit in the budgets and
+        consume them. Callers are served in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self._paused_until - now,
+                           self._wait_for(self._requests, 1, self.requests_per_minute),
+                           self._wait_for(self._tokens, tokens, self.tokens_per_minute))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= min(tokens, self.tokens_per_minute)
+
+    def on_success(self):
+        self.rate_scale = min(1.0, self.rate_scale + 0.05)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        self.rate_scale = max(self.min_rate_scale, self.rate_scale / 2)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute,
+                                 self._requests + elapsed * self._per_second(self.requests_per_minute))
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + elapsed * self._per_second(self.tokens_per_minute))
+
+    def _per_second(self, per_minute: float) -> float:
+        return per_minute * self.rate_scale / 60
+
+    def _wait_for(self, available: float, needed: float, per_minute: Optional[float]) -> float:
+        if not per_minute:
+            return 0.0
+        # Requests larger than the whole budget only wait for a full bucket
+        missing = min(needed, per_minute) - available
+        return missing / self._per_second(per_minute) if missing > 0 else 0.0
+
+
+class RetryPolicy:
+    """
+    Retries transient API failures with jittered exponential backoff, honouring
+    the Retry-After headers sent with rate-limit and overload responses.
+    """
+
+    def __init__(self,
+                 max_retries: int = 5,
+                 initial_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        """
+        :param max_retries: Retries after the first attempt before giving up.
+        :param initial_delay: Backoff ceiling for the first retry, in seconds.
+        :param max_delay: Upper bound for any single delay, in seconds.
+        """
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+
+    async def call(self,
+                   attempt: Callable[[], Awaitable[Any]],
+                   rate_limiter: Optional[RateLimiter] = None) -> Any:
+        """
+        Run ``attempt`` until it succeeds, fails permanently or runs out of retries.
+
+        :param attempt: Zero-argument coroutine function performing one request.
+        :param rate_limiter: Limiter to inform about successes and rate limits.
+        :return: The result of the first successful attempt.
+        """
+        for retry in range(self.max_retries + 1):
+            try:
+                result = await attempt()
+            except Exception as e:
+                if retry == self.max_retries or not self.is_retryable(e):
+                    raise
+                retry_after = self.retry_after(e)
+                if rate_limiter is not None and isinstance(e, openai.RateLimitError):
+                    rate_limiter.on_rate_limited(retry_after)
+                await asyncio.sleep(self.delay(retry, retry_after))
+            else:
+                if rate_limiter is not None:
+                    rate_limiter.on_success()
+                return result
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            # Spread out callers that were all told to come back at the same time
+            return min(self.max_delay, retry_after) + random.uniform(0, self.initial_delay)
+        return random.uniform(0, min(self.max_delay, self.initial_delay * 2 ** retry))
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        if "retry-after-ms" in headers:
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimitedClientMixin:
+    """
+    Routes API requests of the OpenAI components through an optional
+    RateLimiter and RetryPolicy.
+    """
+
+    rate_limiter: Optional[RateLimiter] = None
+    retry_policy: Optional[RetryPolicy] = None
+
+    async def _call_api(self, request: Callable[[Any], Awaitable[Any]], tokens: int = 0) -> Any:
+        client = self.client
+        if self.retry_policy is not None:
+            # Retries are handled here, so the SDK must not retry on its own
+            client = client.with_options(max_retries=0)
+
+        async def attempt():
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(tokens)
+            return await request(client)
+
+        if self.retry_policy is None:
+            response = await attempt()
+        else:
+            response = await self.retry_policy.call(attempt, rate_limiter=self.rate_limiter)
+        record_usage(response)
+        return response
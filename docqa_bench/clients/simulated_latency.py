@@ -0,0 +1,28 @@
+import asyncio
+import random
+from typing import Optional
+
+
+class SimulatedLatency:
+    """
+    Artificial response time for offline backends, so load tests exercise the
+    framework's scheduling as if it were waiting on a remote API.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        """
+        :param latency: Fixed delay per call, in seconds.
+        :param jitter: Upper bound of a uniformly distributed extra delay, in seconds.
+        :param seed: Seed of the jitter, for reproducible runs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    async def wait(self):
+        delay = self.delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
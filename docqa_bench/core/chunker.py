@@ -1,7 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterable, AsyncIterator, List
+
 
 class BaseChunker(ABC):
     @abstractmethod
     async def chunk(self, text: str) -> List[str]:
-        pass
\ No newline at end of file
+        pass
+
+    async def iter_chunks(self, blocks: AsyncIterable[str]) -> AsyncIterator[str]:
+        # Chunkers that can split incrementally should override this
+        text = "".join([block async for block in blocks])
+        for chunk in await self.chunk(text):
+            yield chunk
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class BaseDocument(ABC):
@@ -7,6 +8,12 @@ class BaseDocument(ABC):
     async def get_content(self) -> str:
         pass
 
+    async def iter_content(self, block_size: int = 1 << 20) -> AsyncIterator[str]:
+        # Documents that can be read incrementally should override this
+        content = await self.get_content()
+        for start in range(0, len(content), block_size):
+            yield content[start:start + block_size]
+
 
 class PreprocessedDocument(BaseDocument):
 
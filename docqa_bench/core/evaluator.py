@@ -1,6 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import List
 
 class BaseEvaluator(ABC):
     @abstractmethod
     async def evaluate(self, generated_answer: str, reference_answer: str) -> float:
-        pass
\ No newline at end of file
+        pass
+
+    async def evaluate_batch(self, generated_answers: List[str],
+                             reference_answers: List[str]) -> List[float]:
+        # Evaluators that can score many pairs at once should override this
+        if len(generated_answers) != len(reference_answers):
+            raise ValueError("generated_answers and reference_answers must have the same length")
+        return list(await asyncio.gather(*(
+            self.evaluate(generated_answer, reference_answer)
+            for generated_answer, reference_answer in zip(generated_answers, reference_answers)
+        )))
@@ -1,5 +1,9 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class BaseVectorStore(ABC):
@@ -8,10 +12,87 @@ class BaseVectorStore(ABC):
     async def add(self, id: str, vector: List[float], metadata: dict):
         pass
 
+    async def add_many(self, ids: List[str], vectors: List[List[float]],
+                       metadatas: List[dict], batch_size: int = 1000) -> int:
+        """
+        Add many documents to the store, committing them in batches.
+
+        A failing batch is reported and skipped; the remaining batches are
+        still inserted.
+
+        :param ids: Unique identifiers for the documents.
+        :param vectors: The embedding vectors, one per id.
+        :param metadatas: Metadata dictionaries, one per id.
+        :param batch_size: The maximum number of documents per commit.
+        :return: The number of documents that were added.
+        """
+        if not len(ids) == len(vectors) == len(metadatas):
+            raise ValueError("ids, vectors and metadatas must have the same length")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        added = 0
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            try:
+                await self._add_batch(ids[start:end], vectors[start:end],
+                                      metadatas[start:end])
+                added += end - start
+            except Exception as e:
+                logger.error(f"Error adding batch [{start}:{end}] "
+                             f"({ids[start]}..{ids[end - 1]}): {e}")
+        return added
+
+    async def _add_batch(self, ids: List[str], vectors: List[List[float]],
+                         metadatas: List[dict]):
+        # Stores with a native bulk insert API should override this
+        for id, vector, metadata in zip(ids, vectors, metadatas):
+            await self.add(id, vector, metadata)
+
     @abstractmethod
     async def search(self, query_vector: List[float], k: int) -> List[Dict]:
         pass
 
+    async def search_batch(self, query_vectors: List[List[float]], k: int,
+                           query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Search for several queries.
+
+        :param query_vectors: The embedding vectors of the queries.
+        :param k: The number of results to return per query.
+        :param query_texts: The query texts, one per vector. Dense stores ignore
+            them; stores that also match text, such as HybridStore, use them.
+        :return: A list of search results per query, best first.
+        """
+        # Stores with a native multi-query API should override this
+        return list(await asyncio.gather(
+            *(self.search(query_vector, k) for query_vector in query_vectors)))
+
     @abstractmethod
     async def count(self) -> int:
         pass
+
+    async def ids(self) -> List[str]:
+        """
+        List the ids of all stored documents.
+
+        Stores that support incremental ingestion must override this and delete.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot list its ids")
+
+    async def metadatas(self, ids: List[str]) -> List[Optional[dict]]:
+        """
+        Look up the metadata of stored documents.
+
+        :param ids: The ids of the documents.
+        :return: The metadata of each id, or None for unknown ids.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot look up metadata")
+
+    async def delete(self, ids: List[str]) -> int:
+        """
+        Delete documents from the store. Unknown ids are ignored.
+
+        :param ids: The ids of the documents to delete.
+        :return: The number of documents that were deleted.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletion")
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from docqa_bench.benchmark import Benchmark
+from docqa_bench.core.document import BaseDocument, PreprocessedDocument
+from docqa_bench.core.chunker import BaseChunker
+from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.core.vector_store import BaseVectorStore
+from docqa_bench.core.question_generator import BaseQuestionGenerator
+from docqa_bench.core.answer_generator import BaseAnswerGenerator
+from docqa_bench.core.evaluator import BaseEvaluator
+from docqa_bench.ingestion import ChunkRecord, CorpusIngestor
+from docqa_bench.storage.reference_answers import ReferenceAnswerStore
+from docqa_bench.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusBenchmark(Benchmark):
+
+    def __init__(
+        self,
+        documents: Sequence[BaseDocument],
+        chunker: BaseChunker,
+        embedder: BaseEmbedder,
+        vector_store: BaseVectorStore,
+        question_generator: BaseQuestionGenerator,
+        answer_generator: BaseAnswerGenerator,
+        evaluator: BaseEvaluator,
+        max_concurrency: int = 10,
+        reference_store: Optional[ReferenceAnswerStore] = None,
+        ingest_batch_size: int = 256,
+        ingest_workers: int = 2,
+        document_ids: Optional[Sequence[str]] = None,
+        questions_per_document: int = 10,
+        k: int = 3,
+        processes: Optional[int] = None,
+        incremental: bool = False,
+    ) -> None:
+        """
+        Benchmarks a corpus of documents against one shared vector store.
+
+        All documents are ingested in one pass, questions are generated per
+        document and every question is answered from chunks retrieved across
+        the whole corpus, so retrieval has to find the right document as well
+        as the right passage. Reference answers use the question's own document.
+
+        Args:
+            documents (Sequence[BaseDocument]): The documents in the corpus.
+            document_ids (Optional[Sequence[str]]): Identifiers of the documents,
+                defaulting to each document's path or ``doc_<position>``.
+            questions_per_document (int): Number of questions generated per document.
+            k (int): Number of chunks retrieved per question.
+            processes (Optional[int]): Worker processes used to load and chunk
+                documents; see CorpusIngestor.
+            incremental (bool): As for Benchmark; the store must then hold
+                this corpus only.
+
+            The remaining arguments are as for Benchmark.
+        """
+        self._configure(
+            chunker,
+            embedder,
+            vector_store,
+            question_generator,
+            answer_generator,
+            evaluator,
+            max_concurrency=max_concurrency,
+            reference_store=reference_store,
+            ingest_batch_size=ingest_batch_size,
+            ingest_workers=ingest_workers,
+            incremental=incremental,
+        )
+        self.documents = list(documents)
+        if document_ids is None:
+            document_ids = [
+                CorpusIngestor.document_id(document, i)
+                for i, document in enumerate(self.documents)
+            ]
+        if len(document_ids) != len(self.documents):
+            raise ValueError("documents and document_ids must have the same length")
+        if len(set(document_ids)) != len(document_ids):
+            raise ValueError("document_ids must be unique")
+        self.document_ids = list(document_ids)
+        self.questions_per_document = questions_per_document
+        self.k = k
+        self.processes = processes
+
+    async def _iter_chunk_records(self) -> AsyncIterator[ChunkRecord]:
+        # Chunks of every document, loaded and chunked in a process pool
+        ingestor = CorpusIngestor(
+            self.chunker,
+            self.embedder,
+            self.vector_store,
+            processes=self.processes,
+        )
+        async for record in ingestor.iter_chunks(self.documents, self.document_ids):
+            yield record
+
+    async def _content_hash(self) -> str:
+        # Covers the document ids too, since they are part of every chunk id
+        contents = await asyncio.gather(*(document.get_content() for document in self.documents))
+        return ReferenceAnswerStore.document_hash(json.dumps([
+            [document_id, ReferenceAnswerStore.document_hash(content)]
+            for document_id, content in zip(self.document_ids, contents)
+        ]))
+
+    async def run(self) -> List[Dict[str, Any]]:
+        """
+        Runs the corpus benchmark asynchronously.
+
+        Returns:
+            List[Dict[str, Any]]: One result per question, as for Benchmark.run,
+            with the question's ``document_id``, the ``retrieved_document_ids``
+            of its chunks and whether its ``source_retrieved``.
+        """
+        self.telemetry = Telemetry()
+        with self.telemetry.stage("run"):
+            return await self._run()
+
+    async def _run(self) -> List[Dict[str, Any]]:
+        num_chunks = await self.ingest()
+        logger.info(f"Number of valid chunks: {num_chunks}")
+
+        contents = await asyncio.gather(*(document.get_content() for document in self.documents))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        generated = await asyncio.gather(
+            *(self._generate_questions(content, semaphore) for content in contents)
+        )
+        questions = []
+        sources = []
+        for position, document_questions in enumerate(generated):
+            questions.extend(document_questions)
+            sources.extend([position] * len(document_questions))
+
+        retrieved = await self._retrieve(questions, k=self.k)
+
+        # gather preserves question order
+        results = await asyncio.gather(
+            *(
+                self._process_corpus_question(
+                    questions[i], relevant_chunks, sources[i], contents, semaphore
+                )
+                for i, relevant_chunks in retrieved
+            )
+        )
+        return await self._score(list(results))
+
+    async def _generate_questions(self, content: str, semaphore: asyncio.Semaphore) -> List[str]:
+        async with semaphore:
+            with self.telemetry.stage("question_generation"):
+                return await self.question_generator.generate(
+                    content, n=self.questions_per_document
+                )
+
+    async def _process_corpus_question(
+        self,
+        question: str,
+        relevant_chunks: List[Dict],
+        source: int,
+        contents: List[str],
+        semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        result = await self._process_question(question, relevant_chunks, contents[source], semaphore)
+        document_id = self.document_ids[source]
+        retrieved_document_ids = [
+            chunk["metadata"].get("document_id") for chunk in relevant_chunks
+        ]
+        result["document_id"] = document_id
+        result["retrieved_document_ids"] = retrieved_document_ids
+        result["source_retrieved"] = document_id in retrieved_document_ids
+        return result
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Aggregates per-question results per document and over the corpus.
+
+        Args:
+            results (List[Dict[str, Any]]): Results returned by run.
+
+        Returns:
+            Dict[str, Any]: ``documents`` maps each document id to its number of
+            questions, mean score and source retrieval rate; ``aggregate`` holds
+            the same over all questions plus the mean of the per-document scores.
+        """
+        by_document: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            by_document.setdefault(result["document_id"], []).append(result)
+
+        def summary(document_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+            return {
+                "num_questions": len(document_results),
+                "mean_score": sum(float(r["score"]) for r in document_results)
+                / len(document_results),
+                "source_retrieval_rate": sum(r["source_retrieved"] for r in document_results)
+                / len(document_results),
+            }
+
+        documents = {
+            document_id: summary(document_results)
+            for document_id, document_results in by_document.items()
+        }
+        aggregate = summary(results) if results else {
+            "num_questions": 0, "mean_score": 0.0, "source_retrieval_rate": 0.0
+        }
+        aggregate["num_documents"] = len(documents)
+        aggregate["macro_mean_score"] = (
+            sum(document["mean_score"] for document in documents.values()) / len(documents)
+            if documents else 0.0
+        )
+        return {"documents": documents, "aggregate": aggregate}
+
+    @classmethod
+    async def evaluate_scraped_content(
+        cls,
+        content: str,
+        chunker: BaseChunker,
+        embedder: BaseEmbedder,
+        vector_store: BaseVectorStore,
+        question_generator: BaseQuestionGenerator,
+        answer_generator: BaseAnswerGenerator,
+        evaluator: BaseEvaluator,
+        max_concurrency: int = 10,
+        reference_store: Optional[ReferenceAnswerStore] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluates scraped content as a corpus of one document.
+
+        The arguments are as for Benchmark.evaluate_scraped_content.
+
+        Returns:
+            Dict[str, Any]: The input content and the output of evaluate_corpus.
+        """
+        output = await cls.evaluate_corpus(
+            [PreprocessedDocument(content)],
+            chunker,
+            embedder,
+            vector_store,
+            question_generator,
+            answer_generator,
+            evaluator,
+            max_concurrency=max_concurrency,
+            reference_store=reference_store,
+        )
+        return {"input_content": content, **output}
+
+    @classmethod
+    async def evaluate_corpus(
+        cls,
+        documents: Sequence[BaseDocument],
+        chunker: BaseChunker,
+        embedder: BaseEmbedder,
+        vector_store: BaseVectorStore,
+        question_generator: BaseQuestionGenerator,
+        answer_generator: BaseAnswerGenerator,
+        evaluator: BaseEvaluator,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Evaluates a corpus of documents in one shared vector store.
+
+        Args:
+            documents (Sequence[BaseDocument]): The documents in the corpus.
+            kwargs: Further CorpusBenchmark arguments.
+
+            The remaining arguments are as for Benchmark.
+
+        Returns:
+            Dict[str, Any]: The per-question results and metadata containing the
+            chunk count and the per-document and aggregate summaries.
+        """
+        benchmark = cls(
+            documents,
+            chunker,
+            embedder,
+            vector_store,
+            question_generator,
+            answer_generator,
+            evaluator,
+            **kwargs,
+        )
+        results = await benchmark.run()
+
+        metadata = {
+            "num_chunks": await vector_store.count(),
+            **cls.summarize(results),
+            **benchmark.run_metadata(len(results)),
+        }
+        if benchmark.retrieval_metrics is not None:
+            metadata["retrieval"] = benchmark.retrieval_metrics
+
+        return {
+            "results": results,
+            "metadata": metadata,
+        }
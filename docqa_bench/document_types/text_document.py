@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+import aiofiles
+from docqa_bench.core.document import BaseDocument
+
+
+class TextFileDocument(BaseDocument):
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self.encoding = encoding
+
+    async def get_content(self) -> str:
+        async with aiofiles.open(self.path, encoding=self.encoding) as f:
+            return await f.read()
+
+    async def iter_content(self, block_size: int = 1 << 20) -> AsyncIterator[str]:
+        async with aiofiles.open(self.path, encoding=self.encoding) as f:
+            while True:
+                block = await f.read(block_size)
+                if not block:
+                    break
+                yield block
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.storage.sqlite_cache import SQLiteCache
+
+
+class CachedEmbedder(BaseEmbedder):
+    """
+    Wraps any embedder with a content-addressed embedding cache.
+
+    Embeddings are keyed by (model, SHA-256 of the text). Lookups go through
+    an in-memory LRU first and then an optional SQLite file in which vectors
+    are stored as float32 blobs, so repeated runs over the same corpus only
+    send unseen texts to the wrapped embedder.
+    """
+
+    def __init__(self,
+                 embedder: BaseEmbedder,
+                 path: Optional[str] = None,
+                 max_memory_items: int = 10000):
+        """
+        :param embedder: The embedder whose results are cached.
+        :param path: Path to the SQLite cache file. If None, only the
+            in-memory LRU is used.
+        :param max_memory_items: Maximum number of embeddings kept in memory.
+        """
+        self.embedder = embedder
+        self.model = getattr(embedder, "model", type(embedder).__name__)
+        self.max_memory_items = max_memory_items
+        self.store = SQLiteCache(path, table="embeddings") if path else None
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model}:{digest}"
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in texts]
+        found = self._get_from_memory(keys)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and self.store is not None:
+            stored = await asyncio.to_thread(self.store.get_many, missing)
+            for key, blob in stored.items():
+                found[key] = array("f", blob).tolist()
+                self._remember(key, found[key])
+            missing = [key for key in missing if key not in found]
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_keys = set(missing)
+            # Embed each unseen text once, even if it repeats within the batch
+            to_embed = {key: text for key, text in zip(keys, texts)
+                        if key in missing_keys}
+            embeddings = await self.embedder.embed_batch(list(to_embed.values()))
+            new_items = []
+            for key, embedding in zip(to_embed, embeddings):
+                found[key] = embedding
+                # Failed (empty) embeddings are returned but never cached
+                if embedding:
+                    self._remember(key, embedding)
+                    new_items.append((key, array("f", embedding).tobytes()))
+            if new_items and self.store is not None:
+                await asyncio.to_thread(self.store.put_many, new_items)
+
+        return [found.get(key, []) for key in keys]
+
+    def _get_from_memory(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+        return found
+
+    def _remember(self, key: str, embedding: List[float]):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
@@ -0,0 +1,80 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from docqa_bench.clients.simulated_latency import SimulatedLatency
+from docqa_bench.core.embedder import BaseEmbedder
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Deterministic offline embedder based on signed feature hashing.
+
+    Each lower-cased word (and optionally each pair of adjacent words) is
+    hashed with CRC32 to a dimension and a sign; a text's embedding is the
+    L2-normalised sum of its features. Texts sharing words get similar
+    vectors, which is enough for exercising retrieval, and the same text
+    always maps to the same vector across processes and machines. A batch is
+    assembled with one scatter-add over all its features.
+    """
+
+    def __init__(self,
+                 dimension: int = 256,
+                 ngram_range: Tuple[int, int] = (1, 1),
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        :param dimension: Size of the embedding vectors.
+        :param ngram_range: Smallest and largest word n-gram hashed.
+        :param latency: Simulated delay per embed_batch call, in seconds.
+        :param jitter: Upper bound of a random extra delay per call, in seconds.
+        :param seed: Seed of the jitter.
+        """
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.model = f"hashing-{dimension}"
+        self.latency = SimulatedLatency(latency, jitter, seed)
+        self._features: Dict[str, Tuple[int, float]] = {}
+
+    async def embed(self, text: str) -> List[float]:
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        await self.latency.wait()
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a float32 array of shape (len(texts), dimension).
+        """
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for column, sign in map(self._feature, self._ngrams(text)):
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        np.add.at(vectors, (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)),
+                  np.asarray(signs, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _ngrams(self, text: str) -> List[str]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        low, high = self.ngram_range
+        return [" ".join(words[start:start + n])
+                for n in range(low, high + 1)
+                for start in range(len(words) - n + 1)]
+
+    def _feature(self, ngram: str) -> Tuple[int, float]:
+        feature = self._features.get(ngram)
+        if feature is None:
+            digest = zlib.crc32(ngram.encode("utf-8"))
+            # The low bits pick the dimension and the top bit the sign
+            feature = (digest % self.dimension, 1.0 if digest >> 31 else -1.0)
+            if len(self._features) < 1_000_000:
+                self._features[ngram] = feature
+        return feature
@@ -1,31 +1,141 @@
 import asyncio
-from typing import List
-from openai import OpenAI
+import logging
+from typing import Callable, List, Optional, Tuple, Union
+from openai import AsyncOpenAI, OpenAI
 from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.clients.openai_client import AsyncClientConfig, get_shared_async_client
+from docqa_bench.clients.rate_limiter import (
+    RateLimitedClientMixin, RateLimiter, RetryPolicy, estimate_tokens
+)
 
+logger = logging.getLogger(__name__)
 
-class OpenAIEmbedder(BaseEmbedder):
 
-    def __init__(self, model: str = "text-embedding-ada-002"):
+class OpenAIEmbedder(RateLimitedClientMixin, BaseEmbedder):
+
+    def __init__(self,
+                 model: str = "text-embedding-ada-002",
+                 rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 max_batch_size: int = 2048,
+                 max_batch_tokens: int = 300000,
+                 max_concurrent_batches: int = 4,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        """
+        :param model: The OpenAI embedding model.
+        :param rate_limiter: Optional limiter shared with other components.
+        :param retry_policy: Optional retry policy for failed requests. With
+            one, a transiently failing sub-batch of embed_batch is retried on
+            its own instead of being dropped.
+        :param max_batch_size: Maximum number of inputs per embeddings request.
+        :param max_batch_tokens: Maximum number of tokens per embeddings request.
+        :param max_concurrent_batches: Maximum number of requests in flight
+            for a single embed_batch call.
+        :param token_counter: Returns the token count of a text. The default
+            is a character-based estimate; pass e.g. a tiktoken encoder's
+            length for exact counts.
+        """
         self.model = model
-        self.client = OpenAI()
+        self.client = self._create_client()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrent_batches = max_concurrent_batches
+        self.token_counter = token_counter
+
+    def _create_client(self):
+        return OpenAI()
 
     async def embed(self, text: str) -> List[float]:
         try:
-            response = await asyncio.to_thread(self.client.embeddings.create,
-                                               model=self.model,
-                                               input=text)
+            response = await self._create_embeddings(text)
             return response.data[0].embedding
         except Exception as e:
-            print(f"Error in OpenAIEmbedder: {str(e)}")
+            logger.error(f"Error in OpenAIEmbedder: {str(e)}")
             return []
 
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        try:
-            response = await asyncio.to_thread(self.client.embeddings.create,
-                                               model=self.model,
-                                               input=texts)
-            return [data.embedding for data in response.data]
-        except Exception as e:
-            print(f"Error in OpenAIEmbedder batch embedding: {str(e)}")
-            return [[] for _ in texts]
+        semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+
+        async def embed_sub_batch(start: int, end: int) -> List[List[float]]:
+            async with semaphore:
+                try:
+                    response = await self._create_embeddings(texts[start:end])
+                    return [data.embedding
+                            for data in sorted(response.data, key=lambda data: data.index)]
+                except Exception as e:
+                    # Only the inputs of the failed sub-batch are lost
+                    logger.error(f"Error in OpenAIEmbedder batch embedding "
+                                 f"[{start}:{end}]: {str(e)}")
+                    return [[] for _ in range(start, end)]
+
+        sub_batches = await asyncio.gather(
+            *(embed_sub_batch(start, end) for start, end in self._split_batches(texts)))
+        return [embedding for sub_batch in sub_batches for embedding in sub_batch]
+
+    def _split_batches(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """
+        Split texts into contiguous (start, end) ranges that respect both the
+        per-request item and token limits.
+        """
+        batches = []
+        start = 0
+        batch_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self.token_counter(text)
+            if i > start and (i - start >= self.max_batch_size
+                              or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append((start, i))
+                start, batch_tokens = i, 0
+            batch_tokens += tokens
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
+
+    def _count_tokens(self, input: Union[str, List[str]]) -> int:
+        if isinstance(input, str):
+            return self.token_counter(input)
+        return sum(self.token_counter(text) for text in input)
+
+    async def _create_embeddings(self, input: Union[str, List[str]]):
+        return await self._call_api(
+            lambda client: asyncio.to_thread(client.embeddings.create,
+                                             model=self.model,
+                                             input=input),
+            tokens=self._count_tokens(input))
+
+
+class AsyncOpenAIEmbedder(OpenAIEmbedder):
+    """
+    OpenAIEmbedder backed by a native AsyncOpenAI client instead of worker threads.
+
+    Unless a client is given, a pooled client shared by every component with
+    the same AsyncClientConfig is used. Other keyword arguments are passed to
+    OpenAIEmbedder.
+    """
+
+    def __init__(self,
+                 model: str = "text-embedding-ada-002",
+                 client_config: Optional[AsyncClientConfig] = None,
+                 client: Optional[AsyncOpenAI] = None,
+                 **kwargs):
+        self.client_config = client_config or AsyncClientConfig()
+        self._client = client
+        super().__init__(model, **kwargs)
+
+    def _create_client(self):
+        return self._client
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        return self._client or get_shared_async_client(self.client_config)
+
+    @client.setter
+    def client(self, client: Optional[AsyncOpenAI]):
+        self._client = client
+
+    async def _create_embeddings(self, input: Union[str, List[str]]):
+        return await self._call_api(
+            lambda client: client.embeddings.create(model=self.model, input=input),
+            tokens=self._count_tokens(input))
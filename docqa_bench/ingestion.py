@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from docqa_bench.core.chunker import BaseChunker
+from docqa_bench.core.document import BaseDocument
+from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.core.vector_store import BaseVectorStore
+from docqa_bench.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+# (id, text, metadata) of one chunk on its way into the vector store
+ChunkRecord = Tuple[str, str, dict]
+
+
+async def ingest_batches(batches: AsyncIterable[List[ChunkRecord]],
+                         embedder: BaseEmbedder,
+                         vector_store: BaseVectorStore,
+                         workers: int = 2,
+                         telemetry: Optional[Telemetry] = None) -> int:
+    """
+    Embeds batches of chunks and adds them to a vector store as they arrive.
+
+    Batches flow through a bounded queue to ``workers`` concurrent embedding
+    workers, so a slow embedder applies back-pressure to the producer instead
+    of letting chunks pile up in memory.
+
+    :param batches: Batches of (id, text, metadata) records.
+    :param embedder: The embedder to use.
+    :param vector_store: The store the embedded chunks are added to.
+    :param workers: Number of batches embedded concurrently.
+    :param telemetry: Records the "embedding" and "store" stage of every batch.
+    :return: The number of chunks added to the vector store.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * workers)
+
+    async def produce():
+        async for batch in batches:
+            await queue.put(batch)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def consume() -> int:
+        added = 0
+        while (batch := await queue.get()) is not None:
+            added += await ingest_batch(batch, embedder, vector_store, telemetry)
+        return added
+
+    tasks = [asyncio.create_task(produce())]
+    tasks += [asyncio.create_task(consume()) for _ in range(workers)]
+    try:
+        # A failing task propagates immediately instead of stalling the queue
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return sum(results[1:])
+
+
+async def sync_batches(records: AsyncIterable[ChunkRecord],
+                       embedder: BaseEmbedder,
+                       vector_store: BaseVectorStore,
+                       batch_size: int = 256,
+                       workers: int = 2,
+                       incremental: bool = True,
+                       telemetry: Optional[Telemetry] = None) -> Dict[str, int]:
+    """
+    Brings a vector store up to date with a set of chunks, embedding only new ones.
+
+    With content-addressed chunk ids (see chunk_id), a chunk whose id is
+    already stored is unchanged and skipped, and stored ids missing from the
+    new chunk set belong to removed or edited chunks and are deleted, so
+    re-ingesting a slightly changed document only embeds what changed. The
+    store is synchronised to exactly these records, so it must not hold
+    chunks of other documents.
+
+    :param records: The (id, text, metadata) records of all current chunks.
+    :param embedder: The embedder to use for new chunks.
+    :param vector_store: The store to update.
+    :param batch_size: Number of chunks embedded and stored together.
+    :param workers: Number of batches embedded concurrently.
+    :param incremental: If False, every record is embedded and nothing is
+        deleted. Stores that cannot list their ids are always fully ingested.
+    :param telemetry: Records the "embedding" and "store" stage of every batch.
+    :return: The number of chunks ``added``, ``deleted`` and left ``unchanged``,
+        and the number of new chunks that ``failed`` to be embedded or stored.
+    """
+    existing: set = set()
+    if incremental:
+        try:
+            existing = set(await vector_store.ids())
+        except NotImplementedError as e:
+            logger.warning(f"Ingesting all chunks: {e}")
+            incremental = False
+    seen: set = set()
+    pending = 0
+
+    async def new_records() -> AsyncIterator[ChunkRecord]:
+        nonlocal pending
+        async for record in records:
+            seen.add(record[0])
+            if record[0] not in existing:
+                pending += 1
+                yield record
+
+    added = await ingest_batches(batched(new_records(), batch_size), embedder, vector_store,
+                                 workers, telemetry)
+    deleted = 0
+    removed = existing - seen
+    if removed:
+        deleted = await vector_store.delete(sorted(removed))
+    return {
+        "added": added,
+        "deleted": deleted,
+        "unchanged": len(existing & seen),
+        "failed": pending - added,
+    }
+
+
+async def ingest_batch(batch: List[ChunkRecord],
+                       embedder: BaseEmbedder,
+                       vector_store: BaseVectorStore,
+                       telemetry: Optional[Telemetry] = None) -> int:
+    """
+    Embeds one batch of chunks and adds the valid ones to the store.
+
+    :param batch: The (id, text, metadata) records of the chunks.
+    :param embedder: The embedder to use.
+    :param vector_store: The store the embedded chunks are added to.
+    :param telemetry: Records the "embedding" and "store" stages.
+    :return: The number of chunks added to the vector store.
+    """
+    telemetry = telemetry or Telemetry()
+    try:
+        with telemetry.stage("embedding", chunks=len(batch)):
+            embeddings = await embedder.embed_batch([text for _, text, _ in batch])
+    except Exception as e:
+        logger.error(f"Failed to embed chunks: {e}")
+        return 0
+
+    # Filter out empty embeddings
+    valid = [(id, metadata, embedding)
+             for (id, _, metadata), embedding in zip(batch, embeddings) if embedding]
+    with telemetry.stage("store", chunks=len(valid)):
+        return await vector_store.add_many(
+            [id for id, _, _ in valid],
+            [embedding for _, _, embedding in valid],
+            [metadata for _, metadata, _ in valid],
+        )
+
+
+async def batched(records: AsyncIterable[ChunkRecord], size: int) -> AsyncIterator[List[ChunkRecord]]:
+    batch: List[ChunkRecord] = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def chunk_id(text: str, occurrences: Dict[str, int]) -> str:
+    """
+    Content-addressed id of a chunk, stable across runs and processes.
+
+    :param text: The chunk text.
+    :param occurrences: Number of times each digest was seen so far in the
+        same document, updated in place. Repeated texts get a numbered suffix
+        so that every chunk keeps its own id.
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    occurrence = occurrences.get(digest, 0)
+    occurrences[digest] = occurrence + 1
+    return digest if occurrence == 0 else f"{digest}-{occurrence}"
+
+
+def chunk_document(document: BaseDocument, chunker: BaseChunker) -> List[Tuple[str, int, int]]:
+    """
+    Loads and chunks one document. This is the unit of work run in the process pool.
+
+    :return: The text and (start, end) character offsets of each chunk. Offsets
+        are -1 when a chunk cannot be located in the document.
+    """
+    return asyncio.run(_load_and_chunk(document, chunker))
+
+
+async def _load_and_chunk(document: BaseDocument, chunker: BaseChunker) -> List[Tuple[str, int, int]]:
+    content = await document.get_content()
+    chunk_spans = getattr(chunker, "chunk_spans", None)
+    if chunk_spans is not None:
+        return [(content[start:end], start, end) for start, end in await chunk_spans(content)]
+
+    # Other chunkers only return text, so find each chunk after the previous one
+    chunks = []
+    cursor = 0
+    for chunk in await chunker.chunk(content):
+        start = content.find(chunk, cursor)
+        if start < 0:
+            chunks.append((chunk, -1, -1))
+            continue
+        chunks.append((chunk, start, start + len(chunk)))
+        cursor = start + 1
+    return chunks
+
+
+class CorpusIngestor:
+    """
+    Ingests many documents into one vector store, loading and chunking them in
+    a process pool so that the CPU-bound work scales with the number of cores.
+
+    Documents are chunked as they are submitted and their chunks are streamed
+    into embedding as soon as each document is done, in completion order. Every
+    chunk carries its provenance as metadata: ``document_id``, ``chunk_index``
+    and its ``start``/``end`` character offsets in the document. Chunk ids are
+    ``<document_id>#<chunk_id>``, so sync_batches keeps a chunk across edits
+    elsewhere in its document; its positional metadata is then that of the
+    run that stored it.
+
+    Documents and the chunker are sent to the worker processes, so they must be
+    picklable (e.g. a SimpleChunker whose length_function is a module-level
+    function rather than a lambda). Use ``processes=0`` to chunk in the current
+    process instead.
+    """
+
+    def __init__(self,
+                 chunker: BaseChunker,
+                 embedder: BaseEmbedder,
+                 vector_store: BaseVectorStore,
+                 processes: Optional[int] = None,
+                 batch_size: int = 256,
+                 embed_workers: int = 2,
+                 max_pending_documents: Optional[int] = None,
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        """
+        :param chunker: The chunker applied to every document.
+        :param embedder: The embedder to convert chunks into embeddings.
+        :param vector_store: The store all chunks are added to.
+        :param processes: Number of worker processes. Defaults to the number of
+            CPUs; 0 chunks documents in a thread of the current process.
+        :param batch_size: Number of chunks embedded and stored together.
+        :param embed_workers: Number of batches embedded concurrently.
+        :param max_pending_documents: Documents submitted to the pool ahead of
+            embedding. Defaults to twice the number of processes.
+        :param mp_context: Multiprocessing context of the pool, e.g.
+            ``multiprocessing.get_context("spawn")``.
+        """
+        self.chunker = chunker
+        self.embedder = embedder
+        self.vector_store = vector_store
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.batch_size = batch_size
+        self.embed_workers = embed_workers
+        self.max_pending_documents = max_pending_documents or 2 * max(self.processes, 1)
+        self.mp_context = mp_context
+
+    async def ingest(self, documents: Sequence[BaseDocument],
+                     document_ids: Optional[Sequence[str]] = None) -> int:
+        """
+        Chunks, embeds and stores every document.
+
+        :param documents: The documents to ingest.
+        :param document_ids: Identifiers of the documents, used as chunk id
+            prefixes and provenance. Default to each document's ``path``
+            attribute, or ``doc_<position>``.
+        :return: The number of chunks added to the vector store.
+        """
+        return await ingest_batches(batched(self.iter_chunks(documents, document_ids), self.batch_size),
+                                    self.embedder, self.vector_store, self.embed_workers)
+
+    async def iter_chunks(self, documents: Sequence[BaseDocument],
+                          document_ids: Optional[Sequence[str]] = None) -> AsyncIterator[ChunkRecord]:
+        """
+        Yields the (id, text, metadata) record of every chunk of every document.
+
+        Documents that fail to load or chunk are logged and skipped.
+        """
+        if document_ids is None:
+            document_ids = [self.document_id(document, i) for i, document in enumerate(documents)]
+        if len(document_ids) != len(documents):
+            raise ValueError("documents and document_ids must have the same length")
+
+        loop = asyncio.get_running_loop()
+        executor = None
+        if self.processes > 0:
+            executor = ProcessPoolExecutor(self.processes, mp_context=self.mp_context)
+        pending: Dict[asyncio.Future, str] = {}
+        remaining = iter(zip(document_ids, documents))
+
+        def submit():
+            # Keep a bounded number of documents in flight
+            for document_id, document in remaining:
+                if executor is None:
+                    future = asyncio.ensure_future(
+                        asyncio.to_thread(chunk_document, document, self.chunker))
+                else:
+                    future = loop.run_in_executor(executor, chunk_document, document, self.chunker)
+                pending[future] = document_id
+                if len(pending) >= self.max_pending_documents:
+                    break
+
+        try:
+            submit()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    document_id = pending.pop(future)
+                    try:
+                        chunks = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to chunk document {document_id}: {e}")
+                        continue
+                    occurrences: Dict[str, int] = {}
+                    for index, (text, start, end) in enumerate(chunks):
+                        yield f"{document_id}#{chunk_id(text, occurrences)}", text, {
+                            "text": text,
+                            "document_id": document_id,
+                            "chunk_index": index,
+                            "start": start,
+                            "end": end,
+                        }
+                submit()
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def document_id(document: BaseDocument, position: int) -> str:
+        return str(getattr(document, "path", None) or f"doc_{position}")
@@ -1,23 +1,52 @@
+import re
+import string
+from collections import Counter
+from typing import List
 from docqa_bench.core.evaluator import BaseEvaluator
-from sklearn.metrics import f1_score
-from sklearn.preprocessing import MultiLabelBinarizer
+
+ARTICLES = re.compile(r"\b(a|an|the)\b")
+PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def normalize_answer(text: str) -> str:
+    """
+    SQuAD answer normalisation: lower case, no punctuation, no articles and
+    single spaces.
+    """
+    text = text.lower().translate(PUNCTUATION)
+    return " ".join(ARTICLES.sub(" ", text).split())
+
+
+def token_f1(generated_answer: str, reference_answer: str) -> float:
+    """
+    SQuAD token F1 between two answers, counting repeated tokens.
+    """
+    generated_tokens = normalize_answer(generated_answer).split()
+    reference_tokens = normalize_answer(reference_answer).split()
+    if not generated_tokens or not reference_tokens:
+        # Empty answers only match each other
+        return float(generated_tokens == reference_tokens)
+    reference_counts = Counter(reference_tokens)
+    common = sum(min(count, reference_counts[token])
+                 for token, count in Counter(generated_tokens).items()
+                 if token in reference_counts)
+    if common == 0:
+        return 0.0
+    precision = common / len(generated_tokens)
+    recall = common / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
 
 
 class F1Evaluator(BaseEvaluator):
 
     async def evaluate(self, generated_answer: str,
                        reference_answer: str) -> float:
-        # Convert answers to sets of words
-        generated_words = set(generated_answer.lower().split())
-        reference_words = set(reference_answer.lower().split())
-
-        # Create a vocabulary of all unique words
-        vocab = list(generated_words.union(reference_words))
-
-        # Create binary vectors
-        mlb = MultiLabelBinarizer(classes=vocab)
-        y_true = mlb.fit_transform([reference_words])
-        y_pred = mlb.transform([generated_words])
+        return token_f1(generated_answer, reference_answer)
 
-        # Calculate F1 score
-        return f1_score(y_true, y_pred, average='micro')
+    async def evaluate_batch(self, generated_answers: List[str],
+                             reference_answers: List[str]) -> List[float]:
+        if len(generated_answers) != len(reference_answers):
+            raise ValueError("generated_answers and reference_answers must have the same length")
+        # Scoring is cheap, so score every pair in one pass instead of one task per pair
+        return [token_f1(generated_answer, reference_answer)
+                for generated_answer, reference_answer in zip(generated_answers, reference_answers)]
@@ -0,0 +1,44 @@
+from typing import Collection, Dict, Sequence
+import numpy as np
+
+
+def retrieval_metrics(retrieved_ids: Sequence[Sequence[str]],
+                      relevant_ids: Sequence[Collection[str]],
+                      k: int) -> Dict[str, float]:
+    """
+    Mean recall@k, MRR and nDCG@k over a set of queries with binary relevance.
+
+    :param retrieved_ids: Ranked ids returned for each query; only the first k count.
+    :param relevant_ids: Ids relevant to each query.
+    :param k: The cut-off rank.
+    :return: ``recall@k``, ``mrr`` (reciprocal rank of the first relevant id
+        within the top k, 0 if there is none) and ``ndcg@k``.
+    """
+    if len(retrieved_ids) != len(relevant_ids):
+        raise ValueError("retrieved_ids and relevant_ids must have the same length")
+    if not len(retrieved_ids):
+        return {"recall@k": 0.0, "mrr": 0.0, "ndcg@k": 0.0}
+
+    relevant = np.zeros((len(retrieved_ids), k), dtype=bool)
+    for i, (ranked, expected) in enumerate(zip(retrieved_ids, relevant_ids)):
+        for rank, id in enumerate(ranked[:k]):
+            relevant[i, rank] = id in expected
+    num_relevant = np.array([len(expected) for expected in relevant_ids], dtype=np.float64)
+
+    hits = relevant.sum(axis=1)
+    recall = np.divide(hits, num_relevant, out=np.zeros(len(hits)), where=num_relevant > 0)
+
+    first = relevant.argmax(axis=1)
+    reciprocal_ranks = np.where(relevant.any(axis=1), 1 / (first + 1), 0.0)
+
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    dcg = relevant @ discounts
+    ideal_discounts = np.concatenate(([0.0], np.cumsum(discounts)))
+    idcg = ideal_discounts[np.minimum(num_relevant, k).astype(np.int64)]
+    ndcg = np.divide(dcg, idcg, out=np.zeros(len(dcg)), where=idcg > 0)
+
+    return {
+        "recall@k": float(recall.mean()),
+        "mrr": float(reciprocal_ranks.mean()),
+        "ndcg@k": float(ndcg.mean()),
+    }
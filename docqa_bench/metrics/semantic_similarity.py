@@ -0,0 +1,64 @@
+import logging
+from typing import List
+import numpy as np
+from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.core.evaluator import BaseEvaluator
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticSimilarityEvaluator(BaseEvaluator):
+    """
+    Scores answers by the cosine similarity of their embeddings, so paraphrases
+    of the reference answer are not penalised the way token F1 penalises them.
+
+    ``evaluate_batch`` embeds every distinct answer of a run with a single
+    ``embed_batch`` call; wrap the embedder in a CachedEmbedder to also reuse
+    embeddings across runs. Negative similarities are reported as 0, empty
+    answers only match each other, and pairs whose embedding failed score 0.
+    """
+
+    def __init__(self, embedder: BaseEmbedder):
+        """
+        :param embedder: The embedder used for both answers, typically the
+            benchmark's own (cached) embedder.
+        """
+        self.embedder = embedder
+
+    async def evaluate(self, generated_answer: str, reference_answer: str) -> float:
+        return (await self.evaluate_batch([generated_answer], [reference_answer]))[0]
+
+    async def evaluate_batch(self, generated_answers: List[str],
+                             reference_answers: List[str]) -> List[float]:
+        if len(generated_answers) != len(reference_answers):
+            raise ValueError("generated_answers and reference_answers must have the same length")
+        # Embed each distinct non-empty answer once
+        texts = list(dict.fromkeys(text for text in generated_answers + reference_answers
+                                   if text.strip()))
+        try:
+            embeddings = await self.embedder.embed_batch(texts) if texts else []
+        except Exception as e:
+            logger.error(f"Failed to embed answers: {e}")
+            embeddings = [[] for _ in texts]
+
+        valid = [i for i, embedding in enumerate(embeddings) if embedding]
+        if len(valid) < len(texts):
+            logger.error(f"Failed to embed {len(texts) - len(valid)} answers; they score 0")
+        rows = {texts[i]: row for row, i in enumerate(valid)}
+        vectors = np.asarray([embeddings[i] for i in valid], dtype=np.float32).reshape(len(valid), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        generated_rows = np.array([rows.get(text, -1) for text in generated_answers], dtype=np.int64)
+        reference_rows = np.array([rows.get(text, -1) for text in reference_answers], dtype=np.int64)
+        embedded = (generated_rows >= 0) & (reference_rows >= 0)
+        scores = np.zeros(len(generated_answers), dtype=np.float32)
+        scores[embedded] = np.einsum("ij,ij->i", vectors[generated_rows[embedded]],
+                                     vectors[reference_rows[embedded]])
+        scores = np.clip(scores, 0, 1)
+
+        empty = np.array([not generated.strip() and not reference.strip()
+                          for generated, reference in zip(generated_answers, reference_answers)],
+                         dtype=bool)
+        scores[empty] = 1
+        return scores.astype(float).tolist()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from docqa_bench.core.question_generator import BaseQuestionGenerator
+from docqa_bench.core.answer_generator import BaseAnswerGenerator
+from docqa_bench.storage.sqlite_cache import SQLiteCache
+
+RECORD = "record"
+REPLAY = "replay"
+PASSTHROUGH = "passthrough"
+MODES = (RECORD, REPLAY, PASSTHROUGH)
+
+
+class ResponseCache:
+    """
+    Deterministic record/replay store for model responses.
+
+    Responses are keyed by a hash of (model, messages, params) and kept in
+    memory, optionally backed by a SQLite file so recordings can be shared
+    between runs and checked into CI fixtures.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        :param path: Path to the SQLite cache file. If None, responses are only
+            kept for the lifetime of this object.
+        """
+        self.store = SQLiteCache(path, table="responses") if path else None
+        self._memory: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, messages: Any, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"model": model, "messages": messages, "params": params},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        if key not in self._memory and self.store is not None:
+            stored = await asyncio.to_thread(self.store.get_many, [key])
+            if key in stored:
+                self._memory[key] = json.loads(stored[key])
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key]
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, response: Any):
+        self._memory[key] = response
+        if self.store is not None:
+            await asyncio.to_thread(self.store.put_many,
+                                    [(key, json.dumps(response, ensure_ascii=False))])
+
+
+class _CachedGenerator:
+
+    def __init__(self, generator, cache: ResponseCache, mode: str = RECORD):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.generator = generator
+        self.cache = cache
+        self.mode = mode
+        self.model = getattr(generator, "model", type(generator).__name__)
+
+    def _key(self, params: Dict[str, Any], *inputs: Any) -> str:
+        build_messages = getattr(self.generator, "build_messages", None)
+        # Generators that do not expose their prompt are keyed on their inputs
+        messages = build_messages(*inputs) if build_messages else list(inputs)
+        params = {**getattr(self.generator, "params", {}), **params}
+        return self.cache.key(self.model, messages, params)
+
+    async def _generate(self, key: str, call, empty):
+        if self.mode == PASSTHROUGH:
+            return await call()
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        if self.mode == REPLAY:
+            raise KeyError(f"No recorded response for {type(self.generator).__name__} "
+                           f"({self.model}) in replay mode")
+        response = await call()
+        # Failed calls come back empty and must not be replayed later
+        if response != empty:
+            await self.cache.put(key, response)
+        return response
+
+
+class CachedQuestionGenerator(_CachedGenerator, BaseQuestionGenerator):
+    """
+    Wraps any question generator with a ResponseCache.
+
+    In "record" mode cached responses are replayed and misses are generated and
+    recorded, in "replay" mode a miss raises KeyError, and in "passthrough"
+    mode the cache is bypassed entirely.
+    """
+
+    def __init__(self, generator: BaseQuestionGenerator, cache: ResponseCache,
+                 mode: str = RECORD):
+        super().__init__(generator, cache, mode)
+
+    async def generate(self, context: str, n: int) -> List[str]:
+        return await self._generate(self._key({"n": n}, context, n),
+                                    lambda: self.generator.generate(context, n), [])
+
+
+class CachedAnswerGenerator(_CachedGenerator, BaseAnswerGenerator):
+    """
+    Wraps any answer generator with a ResponseCache.
+
+    Modes behave as for CachedQuestionGenerator.
+    """
+
+    def __init__(self, generator: BaseAnswerGenerator, cache: ResponseCache,
+                 mode: str = RECORD):
+        super().__init__(generator, cache, mode)
+
+    async def generate(self, question: str, context: str) -> str:
+        return await self._generate(self._key({}, question, context),
+                                    lambda: self.generator.generate(question, context), "")
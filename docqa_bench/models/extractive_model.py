@@ -0,0 +1,71 @@
+import re
+from typing import List, Optional
+from docqa_bench.clients.simulated_latency import SimulatedLatency
+from docqa_bench.core.question_generator import BaseQuestionGenerator
+from docqa_bench.core.answer_generator import BaseAnswerGenerator
+
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]?")
+TOKEN_PATTERN = re.compile(r"\w+")
+# Words of the question template and other words too common to locate an answer
+STOPWORDS = {"what", "does", "the", "text", "say", "about", "a", "an", "and", "is",
+             "of", "to", "in", "it", "for", "on"}
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.findall(text)
+            if TOKEN_PATTERN.search(sentence)]
+
+
+class ExtractiveQuestionGenerator(BaseQuestionGenerator):
+    """
+    Offline question generator that turns sentences of the context into questions.
+
+    Questions are taken from evenly spaced sentences, so the same context
+    always yields the same questions, and each question shares its words with
+    the passage it came from.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        """
+        :param latency: Simulated delay per call, in seconds.
+        :param jitter: Upper bound of a random extra delay per call, in seconds.
+        :param seed: Seed of the jitter.
+        """
+        self.model = "extractive"
+        self.latency = SimulatedLatency(latency, jitter, seed)
+
+    async def generate(self, context: str, n: int) -> List[str]:
+        await self.latency.wait()
+        sentences = split_sentences(context)
+        if not sentences or n <= 0:
+            return []
+        count = min(n, len(sentences))
+        step = len(sentences) / count
+        picked = [sentences[int(i * step)] for i in range(count)]
+        return [f"What does the text say about: {sentence.rstrip('.!?')}?" for sentence in picked]
+
+
+class ExtractiveAnswerGenerator(BaseAnswerGenerator):
+    """
+    Offline answer generator that returns the context sentence sharing the
+    most words with the question.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        """
+        :param latency: Simulated delay per call, in seconds.
+        :param jitter: Upper bound of a random extra delay per call, in seconds.
+        :param seed: Seed of the jitter.
+        """
+        self.model = "extractive"
+        self.latency = SimulatedLatency(latency, jitter, seed)
+
+    async def generate(self, question: str, context: str) -> str:
+        await self.latency.wait()
+        question_tokens = set(TOKEN_PATTERN.findall(question.lower())) - STOPWORDS
+        best, best_overlap = "", 0
+        for sentence in split_sentences(context):
+            overlap = len(question_tokens.intersection(TOKEN_PATTERN.findall(sentence.lower())))
+            if overlap > best_overlap:
+                best, best_overlap = sentence, overlap
+        return best
@@ -1,61 +1,155 @@
 import asyncio
-from typing import List
-from openai import OpenAI
+import logging
+from typing import Dict, List, Optional
+from openai import AsyncOpenAI, OpenAI
+from docqa_bench.clients.openai_client import AsyncClientConfig, get_shared_async_client
+from docqa_bench.clients.rate_limiter import (
+    RateLimitedClientMixin, RateLimiter, RetryPolicy, estimate_tokens
+)
 from docqa_bench.core.question_generator import BaseQuestionGenerator
 from docqa_bench.core.answer_generator import BaseAnswerGenerator
 
+logger = logging.getLogger(__name__)
 
-class OpenAIQuestionGenerator(BaseQuestionGenerator):
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+class OpenAIQuestionGenerator(RateLimitedClientMixin, BaseQuestionGenerator):
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         self.model = model
-        self.client = OpenAI()
+        self.client = self._create_client()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+
+    def _create_client(self):
+        return OpenAI()
+
+    def build_messages(self, context: str, n: int) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "Generate questions based on the given context.",
+            },
+            {
+                "role": "user",
+                "content": f"Context: {context}\n\nGenerate {n} questions:",
+            },
+        ]
 
     async def generate(self, context: str, n: int) -> List[str]:
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Generate questions based on the given context.",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Context: {context}\n\nGenerate {n} questions:",
-                    },
-                ],
-            )
+            response = await self._create_completion(self.build_messages(context, n))
             return response.choices[0].message.content.strip().split("\n")
         except Exception as e:
-            print(f"Error in OpenAIQuestionGenerator: {str(e)}")
+            logger.error(f"Error in OpenAIQuestionGenerator: {str(e)}")
             return []
 
+    async def _create_completion(self, messages: List[Dict[str, str]]):
+        return await self._call_api(
+            lambda client: asyncio.to_thread(
+                client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+            ),
+            tokens=estimate_tokens([message["content"] for message in messages]),
+        )
+
 
-class OpenAIAnswerGenerator(BaseAnswerGenerator):
+class OpenAIAnswerGenerator(RateLimitedClientMixin, BaseAnswerGenerator):
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         self.model = model
-        self.client = OpenAI()
+        self.client = self._create_client()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+
+    def _create_client(self):
+        return OpenAI()
+
+    def build_messages(self, question: str, context: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "Answer the question based on the given context.",
+            },
+            {
+                "role": "user",
+                "content": f"Context: {context}\n\nQuestion: {question}",
+            },
+        ]
 
     async def generate(self, question: str, context: str) -> str:
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Answer the question based on the given context.",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Context: {context}\n\nQuestion: {question}",
-                    },
-                ],
+            response = await self._create_completion(
+                self.build_messages(question, context)
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
-            print(f"Error in OpenAIAnswerGenerator: {str(e)}")
+            logger.error(f"Error in OpenAIAnswerGenerator: {str(e)}")
             return ""
+
+    async def _create_completion(self, messages: List[Dict[str, str]]):
+        return await self._call_api(
+            lambda client: asyncio.to_thread(
+                client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+            ),
+            tokens=estimate_tokens([message["content"] for message in messages]),
+        )
+
+
+class _AsyncOpenAIClientMixin:
+    """
+    Replaces the synchronous client and worker threads of the OpenAI generators
+    with a native AsyncOpenAI client, pooled per AsyncClientConfig by default.
+    Other keyword arguments are passed to the wrapped generator class.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        client_config: Optional[AsyncClientConfig] = None,
+        client: Optional[AsyncOpenAI] = None,
+        **kwargs,
+    ):
+        self.client_config = client_config or AsyncClientConfig()
+        self._client = client
+        super().__init__(model, **kwargs)
+
+    def _create_client(self):
+        return self._client
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        return self._client or get_shared_async_client(self.client_config)
+
+    @client.setter
+    def client(self, client: Optional[AsyncOpenAI]):
+        self._client = client
+
+    async def _create_completion(self, messages: List[Dict[str, str]]):
+        return await self._call_api(
+            lambda client: client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+            ),
+            tokens=estimate_tokens([message["content"] for message in messages]),
+        )
+
+
+class AsyncOpenAIQuestionGenerator(_AsyncOpenAIClientMixin, OpenAIQuestionGenerator):
+    """OpenAIQuestionGenerator backed by a native, pooled AsyncOpenAI client."""
+
+
+class AsyncOpenAIAnswerGenerator(_AsyncOpenAIClientMixin, OpenAIAnswerGenerator):
+    """OpenAIAnswerGenerator backed by a native, pooled AsyncOpenAI client."""
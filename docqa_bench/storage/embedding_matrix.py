@@ -0,0 +1,291 @@
+import json
+import os
+from typing import Any, Callable, List, Optional, Sequence, Union
+import numpy as np
+from docqa_bench.core.embedder import BaseEmbedder
+
+DTYPES = ("float32", "float16", "int8")
+INDEX_FILE = "index.json"
+VECTORS_FILE = "vectors.bin"
+SCALES_FILE = "scales.bin"
+IDS_FILE = "ids.bin"
+METADATAS_FILE = "metadatas.bin"
+# Suffix of the int64 row offsets into a records file
+OFFSETS_SUFFIX = ".offsets"
+
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric per-row int8 quantisation.
+
+    :return: The int8 codes and the float32 scale of each row.
+    """
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class Records(Sequence):
+    """
+    Read-only sequence of variable-length rows stored as one concatenated
+    file plus an int64 array of the row offsets.
+
+    Both files are memory-mapped, and a row is decoded only when accessed.
+    """
+
+    def __init__(self, path: str, decode: Callable[[bytes], Any]):
+        """
+        :param path: The records file; its offsets are in ``path + OFFSETS_SUFFIX``.
+        :param decode: Turns the bytes of one row into its value.
+        """
+        self._offsets = np.memmap(path + OFFSETS_SUFFIX, dtype=np.int64, mode="r")
+        self._data = np.memmap(path, dtype=np.uint8, mode="r") if self._offsets[-1] else b""
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._decode(bytes(self._data[start:end]))
+
+
+class RecordsWriter:
+    """
+    Appends rows to a records file and its offsets; see Records.
+    """
+
+    def __init__(self, path: str):
+        self._data = open(path, "wb")
+        self._offsets = open(path + OFFSETS_SUFFIX, "wb")
+        self._position = 0
+        self._offsets.write(np.int64(0).tobytes())
+
+    def write(self, rows: List[bytes]):
+        self._data.write(b"".join(rows))
+        ends = self._position + np.cumsum([len(row) for row in rows], dtype=np.int64)
+        self._offsets.write(ends.tobytes())
+        if len(rows):
+            self._position = int(ends[-1])
+
+    def close(self):
+        self._data.close()
+        self._offsets.close()
+
+
+class EmbeddingMatrix:
+    """
+    A compact, memory-mapped embedding matrix stored in a directory.
+
+    ``vectors.bin`` holds the raw row-major float32, float16 or int8 values,
+    ``scales.bin`` the per-row float32 scales of int8 matrices, ``ids.bin``
+    the row ids (row i belongs to ids[i]), ``metadatas.bin`` the optional
+    per-row JSON metadata, and the small ``index.json`` sidecar the dtype and
+    shape. Opening a matrix only parses the sidecar and maps the other files;
+    ids and metadata are decoded row by row when accessed, so opening does not
+    read the corpus. Code that needs every id (e.g. a vector store building
+    its id lookup) still reads them all once.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an existing matrix. Use EmbeddingMatrixWriter or ``write`` to create one.
+
+        :param path: The matrix directory.
+        """
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        self.dtype = index["dtype"]
+        self.dimension = index["dimension"]
+        self.model = index.get("model")
+        self.normalized = index.get("normalized", False)
+        self.ids: Sequence[str] = Records(os.path.join(path, IDS_FILE), _decode_id)
+        self.metadatas: Optional[Sequence[dict]] = None
+        if index.get("has_metadatas"):
+            self.metadatas = Records(os.path.join(path, METADATAS_FILE), json.loads)
+        shape = (len(self.ids), self.dimension)
+        self.data = self._map(VECTORS_FILE, self.dtype, shape)
+        self.scales = self._map(SCALES_FILE, "float32", (len(self.ids),)) if self.dtype == "int8" else None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_float32(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Return (a selection of) the rows as float32.
+
+        float32 matrices are returned as the read-only memory map itself when
+        no rows are selected; float16 and int8 matrices are dequantised.
+        """
+        data = self.data if rows is None else self.data[np.asarray(rows)]
+        if self.dtype == "int8":
+            scales = self.scales if rows is None else self.scales[np.asarray(rows)]
+            return data.astype(np.float32) * scales[:, None]
+        if self.dtype == "float16":
+            return data.astype(np.float32)
+        return data
+
+    @classmethod
+    def write(cls,
+              path: str,
+              ids: List[str],
+              vectors,
+              dtype: str = "float32",
+              metadatas: Optional[List[dict]] = None,
+              model: Optional[str] = None,
+              normalize: bool = False) -> "EmbeddingMatrix":
+        """
+        Write a complete matrix in one call and open it.
+
+        See EmbeddingMatrixWriter for the parameters.
+        """
+        with EmbeddingMatrixWriter(path, dtype=dtype, model=model, normalize=normalize) as writer:
+            writer.write(ids, vectors, metadatas)
+        return cls(path)
+
+    def _map(self, name: str, dtype: str, shape) -> np.ndarray:
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode="r", shape=shape)
+
+
+def _decode_id(data: bytes) -> str:
+    return data.decode("utf-8")
+
+
+class EmbeddingMatrixWriter:
+    """
+    Streams embeddings, ids and metadata into an EmbeddingMatrix directory
+    batch by batch, so corpora larger than memory can be written. The sidecar
+    is written on close.
+    """
+
+    def __init__(self,
+                 path: str,
+                 dtype: str = "float32",
+                 model: Optional[str] = None,
+                 normalize: bool = False):
+        """
+        :param path: The matrix directory; created if it does not exist.
+        :param dtype: Storage type: "float32", "float16" or "int8" (per-row
+            scalar quantisation).
+        :param model: Name of the embedding model, recorded in the sidecar.
+        :param normalize: L2-normalise rows before storing them, so cosine
+            stores can use a float32 matrix without copying it.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dtype = dtype
+        self.model = model
+        self.normalize = normalize
+        self.dimension: Optional[int] = None
+        self.rows = 0
+        self._has_metadatas = False
+        self._vectors = open(os.path.join(path, VECTORS_FILE), "wb")
+        self._scales = open(os.path.join(path, SCALES_FILE), "wb") if dtype == "int8" else None
+        self._ids = RecordsWriter(os.path.join(path, IDS_FILE))
+        self._metadatas = RecordsWriter(os.path.join(path, METADATAS_FILE))
+
+    def write(self, ids: List[str], vectors, metadatas: Optional[List[dict]] = None):
+        """
+        Append a batch of rows.
+
+        :param ids: Identifiers of the rows.
+        :param vectors: Array-like of shape (len(ids), dimension).
+        :param metadatas: Optional metadata dictionaries, one per id.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2:
+            vectors = vectors.reshape(len(ids), -1)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        elif len(ids) and vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}")
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        if self.dtype == "int8":
+            codes, scales = quantize_int8(vectors)
+            self._vectors.write(codes.tobytes())
+            self._scales.write(scales.tobytes())
+        else:
+            self._vectors.write(vectors.astype(self.dtype).tobytes())
+        self._ids.write([id.encode("utf-8") for id in ids])
+        if metadatas is None:
+            metadatas = [{} for _ in ids]
+        else:
+            self._has_metadatas = True
+        self._metadatas.write([json.dumps(metadata).encode("utf-8") for metadata in metadatas])
+        self.rows += len(ids)
+
+    def close(self):
+        self._vectors.close()
+        if self._scales is not None:
+            self._scales.close()
+        self._ids.close()
+        self._metadatas.close()
+        index = {
+            "dtype": self.dtype,
+            "dimension": self.dimension or 0,
+            "model": self.model,
+            "normalized": self.normalize,
+            "rows": self.rows,
+            "has_metadatas": self._has_metadatas,
+        }
+        with open(os.path.join(self.path, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+    def __enter__(self) -> "EmbeddingMatrixWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def embed_to_matrix(embedder: BaseEmbedder,
+                          path: str,
+                          ids: List[str],
+                          texts: List[str],
+                          dtype: str = "float32",
+                          batch_size: int = 1000,
+                          normalize: bool = False,
+                          store_texts: bool = False) -> EmbeddingMatrix:
+    """
+    Embed texts batch by batch and stream them into an EmbeddingMatrix.
+
+    Texts whose embedding fails are left out of the matrix.
+
+    :param embedder: The embedder to use.
+    :param path: The matrix directory.
+    :param ids: Identifiers of the texts.
+    :param texts: The texts to embed.
+    :param dtype: Storage type: "float32", "float16" or "int8".
+    :param batch_size: Number of texts passed to each embed_batch call.
+    :param normalize: L2-normalise rows before storing them.
+    :param store_texts: Record each text as ``{"text": ...}`` row metadata,
+        which vector stores loading the matrix return with search results.
+    :return: The opened matrix.
+    """
+    model = getattr(embedder, "model", type(embedder).__name__)
+    with EmbeddingMatrixWriter(path, dtype=dtype, model=model, normalize=normalize) as writer:
+        for start in range(0, len(texts), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            batch_texts = texts[start:start + batch_size]
+            embeddings = await embedder.embed_batch(batch_texts)
+            valid = [i for i, embedding in enumerate(embeddings) if embedding]
+            if not valid:
+                continue
+            writer.write([batch_ids[i] for i in valid],
+                         [embeddings[i] for i in valid],
+                         [{"text": batch_texts[i]} for i in valid] if store_texts else None)
+    return EmbeddingMatrix(path)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class ReferenceAnswerStore:
+    """
+    Memoizes full-context reference answers.
+
+    A reference answer depends only on the document, the question and the
+    answering model, never on the chunker, embedder or vector store, so one
+    store can be shared by every retrieval configuration run over a corpus.
+    The contents can be exported to and imported from a JSON golden set.
+    """
+
+    def __init__(self):
+        self._answers: Dict[Tuple[str, str, str], str] = {}
+
+    @staticmethod
+    def document_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, document_hash: str, question: str, model: str) -> Optional[str]:
+        return self._answers.get((document_hash, question, model))
+
+    def put(self, document_hash: str, question: str, model: str, answer: str):
+        self._answers[(document_hash, question, model)] = answer
+
+    async def get_or_generate(self, question: str, content: str, model: str,
+                              generate: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the stored reference answer, generating and storing it if missing.
+
+        :param question: The question to answer.
+        :param content: The full document content.
+        :param model: The name of the answering model.
+        :param generate: Generates the answer when none is stored.
+        :return: The reference answer.
+        """
+        document_hash = self.document_hash(content)
+        answer = self.get(document_hash, question, model)
+        if answer is None:
+            answer = await generate()
+            # Failed generations return "" and should be retried on the next run
+            if answer:
+                self.put(document_hash, question, model, answer)
+        return answer
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        return key in self._answers
+
+    def to_records(self) -> List[Dict[str, str]]:
+        return [{
+            "document_hash": document_hash,
+            "question": question,
+            "model": model,
+            "reference_answer": answer,
+        } for (document_hash, question, model), answer in self._answers.items()]
+
+    def export_golden_set(self, path: str):
+        """
+        Write all stored reference answers to a JSON golden set file.
+
+        :param path: The file to write.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_records(), f, indent=2, ensure_ascii=False)
+
+    def import_golden_set(self, path: str) -> int:
+        """
+        Load reference answers from a JSON golden set file written by
+        export_golden_set, replacing any existing entries with the same key.
+
+        :param path: The file to read.
+        :return: The number of reference answers loaded.
+        """
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        for record in records:
+            self.put(record["document_hash"], record["question"], record["model"],
+                     record["reference_answer"])
+        return len(records)
+
+    @classmethod
+    def from_golden_set(cls, path: str) -> "ReferenceAnswerStore":
+        store = cls()
+        store.import_golden_set(path)
+        return store
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+Value = Union[bytes, str]
+
+
+class SQLiteCache:
+    """
+    A minimal persistent key-value table backed by SQLite.
+
+    Access is serialised through a lock so that a single instance can be used
+    from the worker threads started by ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str, table: str = "cache"):
+        """
+        Open (or create) the cache table.
+
+        :param path: Path to the SQLite database file, or ":memory:".
+        :param table: Name of the table holding the key-value pairs.
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+
+    def get_many(self, keys: List[str]) -> Dict[str, Value]:
+        """
+        Look up several keys at once.
+
+        :param keys: The keys to look up.
+        :return: A dictionary containing only the keys that were found.
+        """
+        found = {}
+        # Stay well below SQLite's limit on the number of bound parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT key, value FROM {self.table} "
+                    f"WHERE key IN ({placeholders})", batch).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Value]]):
+        """
+        Insert or replace several key-value pairs in one transaction.
+
+        :param items: The (key, value) pairs to store.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                items)
+
+    def items(self) -> List[Tuple[str, Value]]:
+        """
+        Return every stored key-value pair.
+        """
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT key, value FROM {self.table}").fetchall()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
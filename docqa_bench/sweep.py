@@ -0,0 +1,338 @@
+import asyncio
+import itertools
+import logging
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+)
+from docqa_bench.core.document import BaseDocument
+from docqa_bench.core.chunker import BaseChunker
+from docqa_bench.core.embedder import BaseEmbedder
+from docqa_bench.core.vector_store import BaseVectorStore
+from docqa_bench.core.question_generator import BaseQuestionGenerator
+from docqa_bench.core.answer_generator import BaseAnswerGenerator
+from docqa_bench.core.evaluator import BaseEvaluator
+from docqa_bench.chunkers.simple_chunker import SimpleChunker
+from docqa_bench.vector_stores.numpy_store import NumpyVectorStore
+from docqa_bench.storage.reference_answers import ReferenceAnswerStore
+from docqa_bench.ingestion import ChunkRecord, batched, chunk_id, ingest_batches
+from docqa_bench.telemetry import Telemetry, model_name
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Grid parameters, from the most upstream to the most downstream stage
+SWEEP_PARAMETERS = ("chunk_size", "chunk_overlap", "embedder", "k", "answer_generator")
+
+
+class Sweep:
+    """
+    Benchmarks every combination of a parameter grid, doing each piece of work once.
+
+    The stages of a run depend on a growing prefix of the parameters: chunks on
+    the chunk size and overlap, the index additionally on the embedder,
+    retrieval on k and answers on the answer generator (and the retrieved
+    context). Each stage result is computed once and shared by every
+    configuration that needs it, so configurations differing only downstream
+    reuse the chunking, embeddings and searches of their siblings. The
+    question set is generated once and reference answers are generated once
+    per question and answering model.
+    """
+
+    def __init__(
+        self,
+        document: BaseDocument,
+        embedders: Dict[str, BaseEmbedder],
+        question_generator: BaseQuestionGenerator,
+        answer_generators: Dict[str, BaseAnswerGenerator],
+        evaluator: BaseEvaluator,
+        chunker_factory: Callable[..., BaseChunker] = SimpleChunker,
+        vector_store_factory: Callable[[], BaseVectorStore] = NumpyVectorStore,
+        reference_generator: Optional[BaseAnswerGenerator] = None,
+        reference_store: Optional[ReferenceAnswerStore] = None,
+        questions: Optional[List[str]] = None,
+        num_questions: int = 10,
+        max_concurrency: int = 10,
+        ingest_batch_size: int = 256,
+        ingest_workers: int = 2,
+    ) -> None:
+        """
+        Initializes the sweep with the components shared by all configurations.
+
+        Args:
+            document (BaseDocument): The document to benchmark on.
+            embedders (Dict[str, BaseEmbedder]): Embedders by the name used in the grid.
+            question_generator (BaseQuestionGenerator): Generates the shared question set.
+            answer_generators (Dict[str, BaseAnswerGenerator]): Answer generators by
+                the name used in the grid.
+            evaluator (BaseEvaluator): The evaluator to score the answers.
+            chunker_factory (Callable[..., BaseChunker]): Builds a chunker from
+                ``chunk_size`` and ``chunk_overlap`` keyword arguments.
+            vector_store_factory (Callable[[], BaseVectorStore]): Builds an empty
+                vector store for each (chunking, embedder) index.
+            reference_generator (Optional[BaseAnswerGenerator]): Generates the
+                full-context reference answers of every configuration. Defaults
+                to each configuration's own answer generator, like Benchmark.
+            reference_store (Optional[ReferenceAnswerStore]): Store of reusable
+                reference answers, shared with other sweeps and benchmarks.
+            questions (Optional[List[str]]): The question set. Generated on the
+                first run if None.
+            num_questions (int): Number of questions generated.
+            max_concurrency (int): Maximum number of embedding and generation
+                calls in flight across all configurations.
+            ingest_batch_size (int): Number of chunks embedded and stored together.
+            ingest_workers (int): Number of batches embedded concurrently per index.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.document = document
+        self.embedders = embedders
+        self.question_generator = question_generator
+        self.answer_generators = answer_generators
+        self.evaluator = evaluator
+        self.chunker_factory = chunker_factory
+        self.vector_store_factory = vector_store_factory
+        self.reference_generator = reference_generator
+        self.reference_store = reference_store if reference_store is not None else ReferenceAnswerStore()
+        self.questions = questions
+        self.num_questions = num_questions
+        self.max_concurrency = max_concurrency
+        self.ingest_batch_size = ingest_batch_size
+        self.ingest_workers = ingest_workers
+        self.telemetry = Telemetry()
+        # Stage results by (stage, *parameters), kept across runs
+        self._work: Dict[Tuple, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def configs(self, grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+        """
+        Expands a parameter grid into configurations.
+
+        Args:
+            grid (Dict[str, Sequence[Any]]): Values per parameter. ``chunk_size``,
+                ``chunk_overlap`` and ``k`` default to 1000, 200 and 3;
+                ``embedder`` and ``answer_generator`` to all configured names.
+
+        Returns:
+            List[Dict[str, Any]]: One configuration per combination, ordered so
+            that configurations sharing upstream work are adjacent. Combinations
+            whose overlap is not smaller than the chunk size are skipped.
+        """
+        unknown = set(grid) - set(SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        values = {
+            "chunk_size": [1000],
+            "chunk_overlap": [200],
+            "embedder": list(self.embedders),
+            "k": [3],
+            "answer_generator": list(self.answer_generators),
+            **grid,
+        }
+        for name in values["embedder"]:
+            if name not in self.embedders:
+                raise ValueError(f"Unknown embedder: {name}")
+        for name in values["answer_generator"]:
+            if name not in self.answer_generators:
+                raise ValueError(f"Unknown answer generator: {name}")
+
+        configs = []
+        for combination in itertools.product(*(values[name] for name in SWEEP_PARAMETERS)):
+            config = dict(zip(SWEEP_PARAMETERS, combination))
+            if config["chunk_overlap"] >= config["chunk_size"]:
+                logger.warning(f"Skipping config with chunk_overlap >= chunk_size: {config}")
+                continue
+            configs.append(config)
+        return configs
+
+    async def run(self, grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+        """
+        Runs every configuration of the grid concurrently.
+
+        Work done by earlier runs of the same sweep is reused, so a grid can be
+        extended without recomputing the configurations already covered.
+
+        Args:
+            grid (Dict[str, Sequence[Any]]): Values per parameter, see configs.
+
+        Returns:
+            List[Dict[str, Any]]: Per configuration, its ``config``, ``metrics``
+            (mean score, number of questions and chunks) and per-question
+            ``results``, in the order of configs.
+        """
+        configs = self.configs(grid)
+        self.telemetry = Telemetry()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        with self.telemetry.stage("sweep", configs=len(configs)):
+            if self.questions is None:
+                content = await self.document.get_content()
+                with self.telemetry.stage("question_generation"):
+                    self.questions = await self.question_generator.generate(content, n=self.num_questions)
+            return list(await asyncio.gather(*(self._run_config(config) for config in configs)))
+
+    async def _run_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        index_key = (config["chunk_size"], config["chunk_overlap"], config["embedder"])
+        _, num_chunks = await self._shared(("index", *index_key), lambda: self._index(*index_key))
+        retrieved = await self._shared(("search", *index_key, config["k"]),
+                                       lambda: self._search(*index_key, config["k"]))
+        content = await self.document.get_content()
+        answer_generator = self.answer_generators[config["answer_generator"]]
+        reference_generator = self.reference_generator or answer_generator
+        reference_model = model_name(reference_generator)
+
+        async def answer(i: int, relevant_chunks: List[Dict]) -> Dict[str, Any]:
+            question = self.questions[i]
+            context = " ".join([chunk["metadata"]["text"] for chunk in relevant_chunks])
+            generated_answer, reference_answer = await asyncio.gather(
+                self._shared(("answer", config["answer_generator"], question, context),
+                             lambda: self._answer(answer_generator, question, context)),
+                self._shared(("reference", reference_model, question),
+                             lambda: self._reference_answer(reference_generator, question, content)),
+            )
+            return {
+                "question": question,
+                "generated_answer": generated_answer,
+                "reference_answer": reference_answer,
+            }
+
+        results = list(await asyncio.gather(*(answer(i, chunks) for i, chunks in retrieved)))
+        with self.telemetry.stage("evaluation", answers=len(results)):
+            scores = await self.evaluator.evaluate_batch(
+                [result["generated_answer"] for result in results],
+                [result["reference_answer"] for result in results],
+            )
+        for result, score in zip(results, scores):
+            result["score"] = score
+        return {
+            "config": config,
+            "metrics": {
+                "mean_score": sum(scores) / len(scores) if scores else 0.0,
+                "num_questions": len(results),
+                "num_chunks": num_chunks,
+            },
+            "results": results,
+        }
+
+    def _shared(self, key: Tuple[Hashable, ...], compute: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """
+        Returns the task computing a stage result, starting it on first use.
+
+        Concurrent configurations await the same task; failed tasks are
+        retried by the next configuration that needs them.
+        """
+        task = self._work.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = self._work[key] = asyncio.ensure_future(compute())
+        return task
+
+    async def _chunk(self, chunk_size: int, chunk_overlap: int) -> List[ChunkRecord]:
+        chunker = self.chunker_factory(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        with self.telemetry.stage("chunking", chunk_size=chunk_size, chunk_overlap=chunk_overlap):
+            chunks = [chunk async for chunk in chunker.iter_chunks(self.document.iter_content())]
+        occurrences: Dict[str, int] = {}
+        return [(chunk_id(chunk, occurrences), chunk, {"text": chunk}) for chunk in chunks]
+
+    async def _index(self, chunk_size: int, chunk_overlap: int,
+                     embedder_name: str) -> Tuple[BaseVectorStore, int]:
+        records = await self._shared(("chunks", chunk_size, chunk_overlap),
+                                     lambda: self._chunk(chunk_size, chunk_overlap))
+        vector_store = self.vector_store_factory()
+        with self.telemetry.stage("ingest", chunks=len(records), embedder=embedder_name):
+            num_chunks = await ingest_batches(
+                batched(_iterate(records), self.ingest_batch_size),
+                _BudgetedEmbedder(self.embedders[embedder_name], self._semaphore),
+                vector_store,
+                self.ingest_workers,
+                telemetry=self.telemetry,
+            )
+        return vector_store, num_chunks
+
+    async def _question_vectors(self, embedder_name: str) -> List[List[float]]:
+        try:
+            async with self._semaphore:
+                with self.telemetry.stage("question_embedding", questions=len(self.questions)):
+                    return await self.embedders[embedder_name].embed_batch(self.questions)
+        except Exception as e:
+            logger.error(f"Failed to embed questions with {embedder_name}: {e}")
+            return [[] for _ in self.questions]
+
+    async def _search(self, chunk_size: int, chunk_overlap: int, embedder_name: str,
+                      k: int) -> List[Tuple[int, List[Dict]]]:
+        vector_store, _ = await self._shared(("index", chunk_size, chunk_overlap, embedder_name),
+                                             lambda: self._index(chunk_size, chunk_overlap, embedder_name))
+        question_vectors = await self._shared(("question_vectors", embedder_name),
+                                              lambda: self._question_vectors(embedder_name))
+        # Questions that could not be embedded are left out, as in Benchmark
+        retrievable = [i for i, vector in enumerate(question_vectors) if vector]
+        vectors = [question_vectors[i] for i in retrievable]
+        with self.telemetry.stage("search", queries=len(vectors), k=k):
+            relevant_chunks = await vector_store.search_batch(
+                vectors, k=k, query_texts=[self.questions[i] for i in retrievable]
+            )
+        return list(zip(retrievable, relevant_chunks))
+
+    async def _answer(self, answer_generator: BaseAnswerGenerator, question: str, context: str) -> str:
+        async with self._semaphore:
+            with self.telemetry.stage("answer_generation"):
+                return await answer_generator.generate(question, context)
+
+    async def _reference_answer(self, answer_generator: BaseAnswerGenerator,
+                                question: str, content: str) -> str:
+        async def generate() -> str:
+            async with self._semaphore:
+                with self.telemetry.stage("reference_answer"):
+                    return await answer_generator.generate(question, content)
+
+        return await self.reference_store.get_or_generate(
+            question, content, model_name(answer_generator), generate
+        )
+
+    @staticmethod
+    def table(rows: List[Dict[str, Any]]) -> str:
+        """
+        Formats sweep results as a plain-text comparison table, best mean score first.
+
+        Args:
+            rows (List[Dict[str, Any]]): The output of run.
+
+        Returns:
+            str: One line per configuration with its parameters and metrics.
+        """
+        header = [*SWEEP_PARAMETERS, "mean_score", "num_questions", "num_chunks"]
+        lines = [header]
+        for row in sorted(rows, key=lambda row: row["metrics"]["mean_score"], reverse=True):
+            metrics = row["metrics"]
+            lines.append([
+                *(str(row["config"][name]) for name in SWEEP_PARAMETERS),
+                f"{metrics['mean_score']:.4f}",
+                str(metrics["num_questions"]),
+                str(metrics["num_chunks"]),
+            ])
+        widths = [max(len(line[column]) for line in lines) for column in range(len(header))]
+        return "\n".join(
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+            for line in lines
+        )
+
+
+class _BudgetedEmbedder(BaseEmbedder):
+    """
+    Takes a slot of the sweep's concurrency budget for every embedding call.
+    """
+
+    def __init__(self, embedder: BaseEmbedder, semaphore: asyncio.Semaphore):
+        self.embedder = embedder
+        self.semaphore = semaphore
+
+    async def embed(self, text: str) -> List[float]:
+        async with self.semaphore:
+            return await self.embedder.embed(text)
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        async with self.semaphore:
+            return await self.embedder.embed_batch(texts)
+
+
+async def _iterate(records: List[ChunkRecord]) -> AsyncIterator[ChunkRecord]:
+    for record in records:
+        yield record
@@ -0,0 +1,160 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, TypeVar
+import numpy as np
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    # Spans become no-ops, timings and usage are still collected
+    trace = None
+
+T = TypeVar("T")
+
+# USD per million (input, output) tokens
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-ada-002": (0.10, 0.0),
+}
+
+
+@dataclass
+class Usage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def add(self, other: "Usage"):
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+
+
+_current_usage: ContextVar[Optional[Usage]] = ContextVar("docqa_bench_usage", default=None)
+
+
+def record_usage(response: Any):
+    """
+    Add the token usage reported with an API response to the enclosing stage.
+
+    Chat completions report prompt and completion tokens, embeddings only
+    prompt tokens. Responses without usage are ignored.
+    """
+    usage = _current_usage.get()
+    reported = getattr(response, "usage", None)
+    if usage is None or reported is None:
+        return
+    usage.input_tokens += getattr(reported, "prompt_tokens", 0) or 0
+    usage.output_tokens += getattr(reported, "completion_tokens", 0) or 0
+
+
+def model_name(component: Any) -> str:
+    """
+    The model a component reports, e.g. for pricing or keying reference answers;
+    its class name for components without a ``model`` attribute.
+    """
+    return getattr(component, "model", type(component).__name__)
+
+
+def estimate_cost(model: Optional[str], usage: Usage) -> float:
+    """
+    Estimated cost in USD of the usage for a model in MODEL_PRICES; 0 for other models.
+    """
+    input_price, output_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (usage.input_tokens * input_price + usage.output_tokens * output_price) / 1e6
+
+
+class Telemetry:
+    """
+    Collects per-stage latencies and token usage of a benchmark run, and wraps
+    each stage in an OpenTelemetry span when the API is installed.
+
+    Spans go to whatever tracer provider the application configured; without
+    one, the OpenTelemetry API's own no-op tracer is used.
+    """
+
+    def __init__(self, tracer_name: str = "docqa_bench", tracer_provider: Any = None):
+        """
+        :param tracer_name: Instrumentation name of the spans.
+        :param tracer_provider: Provider to create spans with instead of the
+            globally configured one.
+        """
+        self.tracer = None
+        if trace is not None:
+            self.tracer = trace.get_tracer(tracer_name, tracer_provider=tracer_provider)
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.usage: Dict[str, Usage] = defaultdict(Usage)
+
+    @contextmanager
+    def stage(self, name: str, **attributes) -> Iterator[Usage]:
+        """
+        Time a stage and collect the token usage reported inside it.
+
+        :param name: The stage name, also used as the span name.
+        :param attributes: Span attributes.
+        :return: The usage reported while the stage ran. Usage is attributed to
+            the innermost stage only, so stage usages can be summed.
+        """
+        span_context = nullcontext()
+        if self.tracer is not None:
+            span_context = self.tracer.start_as_current_span(name, attributes=attributes)
+        usage = Usage()
+        token = _current_usage.set(usage)
+        start = time.perf_counter()
+        try:
+            with span_context as span:
+                yield usage
+                if span is not None:
+                    span.set_attribute("tokens.input", usage.input_tokens)
+                    span.set_attribute("tokens.output", usage.output_tokens)
+        finally:
+            self.durations[name].append(time.perf_counter() - start)
+            _current_usage.reset(token)
+            self.usage[name].add(usage)
+
+    async def timed_iter(self, name: str, items: AsyncIterable[T]) -> AsyncIterator[T]:
+        """
+        Yield from an async iterable, timing how long each item takes to produce.
+
+        The time the consumer spends between items is not counted.
+        """
+        iterator = items.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                self.durations[name].append(time.perf_counter() - start)
+            yield item
+
+    def total_usage(self) -> Usage:
+        total = Usage()
+        for usage in self.usage.values():
+            total.add(usage)
+        return total
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage count, total and mean seconds, and p50/p95/p99 latency in seconds.
+        """
+        summary = {}
+        for name, durations in self.durations.items():
+            values = np.asarray(durations)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[name] = {
+                "count": len(values),
+                "total": float(values.sum()),
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+            }
+        return summary
@@ -1,23 +1,44 @@
 import asyncio
+import json
 import logging
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 import chromadb
 from docqa_bench.core.vector_store import BaseVectorStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Collection metadata key holding the JSON manifest of the index
+MANIFEST_KEY = "docqa_bench_manifest"
+
 
 class ChromaStore(BaseVectorStore):
+    """
+    Vector store backed by a ChromaDB collection.
+
+    With a ``path`` the collection lives in a persistent on-disk database, so
+    later processes can attach to an index built earlier. The collection's
+    manifest records how the index was built (embedding model, dimension,
+    chunker parameters and content hash); Benchmark.ingest skips ingestion
+    when it matches the current configuration.
+    """
 
-    def __init__(self, collection_name: str):
+    def __init__(self, collection_name: str, path: Optional[str] = None):
         """
         Initialize ChromaStore with a collection name.
 
-        :param collection_name: The name of the collection to create in ChromaDB.
+        :param collection_name: The name of the collection, created if it does
+            not exist yet and reused otherwise.
+        :param path: Directory of a persistent ChromaDB database. Defaults to
+            an in-memory database, in which collections of the same name are
+            shared within the process.
         """
-        self.client = chromadb.Client()
-        self.collection = self.client.create_collection(name=collection_name)
+        self.path = path
+        if path is None:
+            self.client = chromadb.Client()
+        else:
+            self.client = chromadb.PersistentClient(path=path)
+        self.collection = self.client.get_or_create_collection(name=collection_name)
 
     async def add(self, id: str, vector: List[float], metadata: dict):
         """
@@ -28,15 +49,28 @@ class ChromaStore(BaseVectorStore):
         :param metadata: Dictionary containing metadata including the document text.
         """
         try:
-            await asyncio.to_thread(self.collection.add,
-                                    embeddings=[vector],
-                                    documents=[metadata.get('text', '')],
-                                    metadatas=[metadata],
-                                    ids=[id])
+            await self._add_batch([id], [vector], [metadata])
         except Exception as e:
             logger.error(f"Error adding to ChromaDB: {e}")
             raise
 
+    async def _add_batch(self, ids: List[str], vectors: List[List[float]],
+                         metadatas: List[dict]):
+        """
+        Add a batch of documents to the ChromaDB collection in a single call.
+        Existing ids are replaced, as in the other stores.
+
+        :param ids: Unique identifiers for the documents.
+        :param vectors: The embedding vectors associated with the documents.
+        :param metadatas: Metadata dictionaries including the document texts.
+        """
+        await asyncio.to_thread(self.collection.upsert,
+                                embeddings=vectors,
+                                documents=[metadata.get('text', '')
+                                           for metadata in metadatas],
+                                metadatas=metadatas,
+                                ids=ids)
+
     async def search(self, query_vector: List[float], k: int) -> List[Dict]:
         """
         Search the ChromaDB collection for the closest documents to the query vector.
@@ -45,25 +79,41 @@ class ChromaStore(BaseVectorStore):
         :param k: The number of closest results to return.
         :return: A list of dictionaries containing the search results.
         """
+        results = await self.search_batch([query_vector], k)
+        return results[0] if results else []
+
+    async def search_batch(self, query_vectors: List[List[float]], k: int,
+                           query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Search the ChromaDB collection for several query vectors in a single query.
+
+        :param query_vectors: The embedding vectors to search for.
+        :param k: The number of closest results to return for each query.
+        :param query_texts: Ignored; the search is dense only.
+        :return: A list of search results per query vector, in query order.
+        """
+        if not query_vectors:
+            return []
         try:
             results = await asyncio.to_thread(self.collection.query,
-                                              query_embeddings=[query_vector],
+                                              query_embeddings=query_vectors,
                                               n_results=k)
 
             if not results or not results.get('ids'):
                 logger.warning("No results found in ChromaDB search")
-                return []
+                return [[] for _ in query_vectors]
 
-            return [{
+            return [[{
                 "id": id,
                 "score": score,
                 "metadata": metadata
-            } for id, score, metadata in
-                    zip(results['ids'][0], results['distances'][0],
-                        results['metadatas'][0])]
+            } for id, score, metadata in zip(ids, distances, metadatas)]
+                    for ids, distances, metadatas in
+                    zip(results['ids'], results['distances'],
+                        results['metadatas'])]
         except Exception as e:
             logger.error(f"Error searching ChromaDB: {e}")
-            return []
+            return [[] for _ in query_vectors]
 
     async def count(self) -> int:
         """
@@ -76,3 +126,66 @@ class ChromaStore(BaseVectorStore):
         except Exception as e:
             logger.error(f"Error counting ChromaDB entries: {e}")
             return 0
+
+    async def ids(self) -> List[str]:
+        """
+        List the ids of all documents in the ChromaDB collection.
+
+        :return: The stored ids.
+        """
+        results = await asyncio.to_thread(self.collection.get, include=[])
+        return results["ids"]
+
+    async def metadatas(self, ids: List[str]) -> List[Optional[dict]]:
+        """
+        Look up the metadata of documents in the ChromaDB collection.
+
+        :param ids: The ids of the documents.
+        :return: The metadata of each id, or None for unknown ids.
+        """
+        if not ids:
+            return []
+        results = await asyncio.to_thread(self.collection.get, ids=ids, include=["metadatas"])
+        # Results are not returned in the order of the requested ids
+        found = dict(zip(results["ids"], results["metadatas"]))
+        return [found.get(id) for id in ids]
+
+    async def delete(self, ids: List[str]) -> int:
+        """
+        Delete documents from the ChromaDB collection.
+
+        :param ids: The ids to delete; unknown ids are ignored.
+        :return: The number of documents that were deleted.
+        """
+        if not ids:
+            return 0
+        existing = (await asyncio.to_thread(self.collection.get, ids=ids, include=[]))["ids"]
+        if existing:
+            await asyncio.to_thread(self.collection.delete, ids=existing)
+        return len(existing)
+
+    async def get_manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the manifest describing how the collection's index was built.
+
+        :return: The manifest, or None if none was written.
+        """
+        manifest = (self.collection.metadata or {}).get(MANIFEST_KEY)
+        return json.loads(manifest) if manifest else None
+
+    async def set_manifest(self, manifest: Dict[str, Any]):
+        """
+        Store a manifest with the collection, adding the dimension of its vectors.
+
+        :param manifest: JSON-serialisable description of the index.
+        """
+        stored = await asyncio.to_thread(self.collection.get, limit=1, include=["embeddings"])
+        # Embeddings come back as an array, so avoid its truth value
+        embeddings = stored.get("embeddings")
+        dimension = len(embeddings[0]) if embeddings is not None and len(embeddings) else None
+        manifest = {**manifest, "dimension": dimension}
+        # The distance function is fixed at creation and cannot be modified
+        metadata = {key: value for key, value in (self.collection.metadata or {}).items()
+                    if not key.startswith("hnsw:")}
+        metadata[MANIFEST_KEY] = json.dumps(manifest, sort_keys=True)
+        await asyncio.to_thread(self.collection.modify, metadata=metadata)
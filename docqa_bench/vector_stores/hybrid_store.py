@@ -0,0 +1,314 @@
+import logging
+import math
+import re
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from docqa_bench.core.vector_store import BaseVectorStore
+
+FUSIONS = ("rrf", "weighted")
+TOKEN_PATTERN = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class HybridStore(BaseVectorStore):
+    """
+    Combines a dense vector store with a BM25 keyword index over the chunk texts.
+
+    Every document added is forwarded to the dense store and indexed under its
+    ``metadata['text']``. The inverted index keeps one pair of compact integer
+    arrays per term (rows and term frequencies) that new documents are appended
+    to, so indexing is incremental and a query term is scored with a few numpy
+    operations over its postings. Re-adding or deleting an id leaves its old row
+    behind as a tombstone that searches skip; once tombstones outnumber half the
+    live rows, the index is compacted.
+
+    The keyword index lives in memory only. When the dense store holds
+    documents the keyword index lacks, e.g. a persistent store reopened by a
+    new process, their texts are read back from the dense store and indexed
+    before the next keyword search or listing of ids (see sync_keyword_index).
+
+    Searches with query texts fuse the dense and BM25 rankings, either by
+    reciprocal-rank fusion or by a weighted sum of min-max normalised scores.
+    The returned ``score`` is the fused relevance, so unlike the dense stores'
+    distances, higher is better. Without query texts, searches are dense-only.
+    """
+
+    def __init__(self,
+                 dense_store: BaseVectorStore,
+                 fusion: str = "rrf",
+                 rrf_k: int = 60,
+                 dense_weight: float = 0.5,
+                 candidate_multiplier: int = 4,
+                 k1: float = 1.2,
+                 b: float = 0.75,
+                 tokenizer: Callable[[str], List[str]] = tokenize):
+        """
+        :param dense_store: The store answering the vector half of each query.
+        :param fusion: "rrf" for reciprocal-rank fusion or "weighted" for a
+            weighted sum of normalised scores.
+        :param rrf_k: The rank offset of reciprocal-rank fusion.
+        :param dense_weight: Weight of the dense score for "weighted" fusion;
+            BM25 gets ``1 - dense_weight``.
+        :param candidate_multiplier: Each ranking contributes
+            ``candidate_multiplier * k`` candidates to the fusion.
+        :param k1: BM25 term frequency saturation.
+        :param b: BM25 document length normalisation.
+        :param tokenizer: Splits texts and queries into terms.
+        """
+        if fusion not in FUSIONS:
+            raise ValueError(f"fusion must be one of {FUSIONS}, got {fusion!r}")
+        self.dense_store = dense_store
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.dense_weight = dense_weight
+        self.candidate_multiplier = candidate_multiplier
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = array("i")
+        self._total_length = 0
+        self._ids: List[str] = []
+        self._metadatas: List[dict] = []
+        self._rows: Dict[str, int] = {}
+        self._removed: set = set()
+
+    async def add(self, id: str, vector: List[float], metadata: dict):
+        await self.dense_store.add(id, vector, metadata)
+        self.index_texts([id], [metadata])
+
+    async def add_many(self, ids: List[str], vectors: List[List[float]],
+                       metadatas: List[dict], batch_size: int = 1000) -> int:
+        if not len(ids) == len(vectors) == len(metadatas):
+            raise ValueError("ids, vectors and metadatas must have the same length")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        added = 0
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            # One dense commit per batch, so the batch was stored entirely or not at all
+            batch_added = await self.dense_store.add_many(
+                ids[start:end], vectors[start:end], metadatas[start:end], batch_size=batch_size
+            )
+            if batch_added == end - start:
+                self.index_texts(ids[start:end], metadatas[start:end])
+            added += batch_added
+        return added
+
+    def index_texts(self, ids: List[str], metadatas: List[dict]):
+        """
+        Add documents to the keyword index only.
+
+        :param ids: Unique identifiers for the documents.
+        :param metadatas: Metadata dictionaries holding the texts under "text".
+        """
+        for id, metadata in zip(ids, metadatas):
+            previous = self._rows.get(id)
+            if previous is not None:
+                self._removed.add(previous)
+                self._total_length -= self._lengths[previous]
+            row = len(self._ids)
+            self._rows[id] = row
+            self._ids.append(id)
+            self._metadatas.append(metadata)
+            terms = self.tokenizer(metadata.get("text", ""))
+            self._lengths.append(len(terms))
+            self._total_length += len(terms)
+            frequencies: Dict[str, int] = {}
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0) + 1
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("i"), array("i"))
+                postings[0].append(row)
+                postings[1].append(frequency)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if len(self._removed) > len(self._rows) / 2:
+            self._compact()
+
+    def _compact(self):
+        # Renumber the live rows in order, so every term's postings stay sorted
+        kept = np.array(sorted(self._rows.values()), dtype=np.int32)
+        remap = np.full(len(self._ids), -1, dtype=np.int32)
+        remap[kept] = np.arange(len(kept), dtype=np.int32)
+        for term, (rows, frequencies) in list(self._postings.items()):
+            rows = np.frombuffer(rows, dtype=np.int32)
+            live = remap[rows] >= 0
+            if not live.any():
+                del self._postings[term]
+                continue
+            self._postings[term] = (
+                array("i", remap[rows[live]].tobytes()),
+                array("i", np.frombuffer(frequencies, dtype=np.int32)[live].tobytes()),
+            )
+        lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        self._lengths = array("i", lengths[kept].tobytes())
+        self._ids = [self._ids[row] for row in kept.tolist()]
+        self._metadatas = [self._metadatas[row] for row in kept.tolist()]
+        self._rows = {id: int(remap[row]) for id, row in self._rows.items()}
+        self._removed = set()
+
+    async def search(self, query_vector: List[float], k: int,
+                     query_text: Optional[str] = None) -> List[Dict]:
+        query_texts = None if query_text is None else [query_text]
+        return (await self.search_batch([query_vector], k, query_texts))[0]
+
+    async def search_batch(self, query_vectors: List[List[float]], k: int,
+                           query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        Hybrid search for several queries.
+
+        :param query_vectors: The embedding vectors of the queries.
+        :param k: The number of results to return per query.
+        :param query_texts: The query texts, one per vector. If None, the
+            dense store's results are returned unchanged.
+        :return: A list of search results per query, best first.
+        """
+        if query_texts is None:
+            return await self.dense_store.search_batch(query_vectors, k)
+        if len(query_texts) != len(query_vectors):
+            raise ValueError("query_vectors and query_texts must have the same length")
+        if len(self._rows) != await self.dense_store.count():
+            await self.sync_keyword_index()
+        candidates = self.candidate_multiplier * k
+        dense_results = await self.dense_store.search_batch(query_vectors, candidates)
+        keyword_results = self.keyword_search_batch(query_texts, candidates)
+        return [self._fuse(dense, keyword, k)
+                for dense, keyword in zip(dense_results, keyword_results)]
+
+    def keyword_search_batch(self, query_texts: List[str], k: int) -> List[List[Tuple[int, float]]]:
+        """
+        BM25 top-k for several queries.
+
+        :return: (row, score) pairs per query, best first.
+        """
+        num_rows = len(self._ids)
+        live = len(self._rows)
+        if live == 0 or k <= 0:
+            return [[] for _ in query_texts]
+        lengths = np.frombuffer(self._lengths, dtype=np.int32).astype(np.float32)
+        # Per-row BM25 length normalisation, shared by every query term
+        norms = self.k1 * (1 - self.b + self.b * lengths * live / max(self._total_length, 1))
+        alive = np.ones(num_rows, dtype=bool)
+        alive[np.fromiter(self._removed, dtype=np.int64, count=len(self._removed))] = False
+
+        results = []
+        for query_text in query_texts:
+            scores = np.zeros(num_rows, dtype=np.float32)
+            for term in set(self.tokenizer(query_text)):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                rows = np.frombuffer(postings[0], dtype=np.int32)
+                frequencies = np.frombuffer(postings[1], dtype=np.int32).astype(np.float32)
+                # Tombstoned rows count neither towards N nor towards the term's df
+                mask = alive[rows]
+                rows, frequencies = rows[mask], frequencies[mask]
+                if not len(rows):
+                    continue
+                idf = math.log(1 + (live - len(rows) + 0.5) / (len(rows) + 0.5))
+                # Rows are unique within one term's postings
+                scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[rows])
+            top = min(k, int(np.count_nonzero(scores)))
+            if top == 0:
+                results.append([])
+                continue
+            rows = np.argpartition(-scores, top - 1)[:top]
+            rows = rows[np.argsort(-scores[rows], kind="stable")]
+            results.append(list(zip(rows.tolist(), scores[rows].tolist())))
+        return results
+
+    def _fuse(self, dense: List[Dict], keyword: List[Tuple[int, float]], k: int) -> List[Dict]:
+        fused: Dict[str, float] = {}
+        metadatas: Dict[str, dict] = {}
+        if self.fusion == "rrf":
+            for rank, result in enumerate(dense):
+                fused[result["id"]] = 1 / (self.rrf_k + rank + 1)
+                metadatas[result["id"]] = result["metadata"]
+            for rank, (row, _) in enumerate(keyword):
+                id = self._ids[row]
+                fused[id] = fused.get(id, 0.0) + 1 / (self.rrf_k + rank + 1)
+                metadatas.setdefault(id, self._metadatas[row])
+        else:
+            # Dense scores are distances, so lower becomes better after normalising
+            dense_scores = self._min_max([-result["score"] for result in dense])
+            for result, score in zip(dense, dense_scores):
+                fused[result["id"]] = self.dense_weight * score
+                metadatas[result["id"]] = result["metadata"]
+            keyword_scores = self._min_max([score for _, score in keyword])
+            for (row, _), score in zip(keyword, keyword_scores):
+                id = self._ids[row]
+                fused[id] = fused.get(id, 0.0) + (1 - self.dense_weight) * score
+                metadatas.setdefault(id, self._metadatas[row])
+        best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{"id": id, "score": score, "metadata": metadatas[id]} for id, score in best]
+
+    @staticmethod
+    def _min_max(scores: List[float]) -> List[float]:
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0 for _ in scores]
+        return [(score - low) / (high - low) for score in scores]
+
+    async def count(self) -> int:
+        return await self.dense_store.count()
+
+    async def ids(self) -> List[str]:
+        ids = await self.dense_store.ids()
+        await self._sync_keyword_index(ids)
+        return ids
+
+    async def metadatas(self, ids: List[str]) -> List[Optional[dict]]:
+        return await self.dense_store.metadatas(ids)
+
+    async def sync_keyword_index(self) -> int:
+        """
+        Bring the keyword index in line with the dense store.
+
+        Documents the keyword index lacks are indexed from the text stored in
+        their dense metadata, and documents no longer in the dense store are
+        dropped from it.
+
+        :return: The number of documents added to the keyword index.
+        """
+        return await self._sync_keyword_index(await self.dense_store.ids())
+
+    async def _sync_keyword_index(self, ids: List[str]) -> int:
+        stored = set(ids)
+        for id in [id for id in self._rows if id not in stored]:
+            row = self._rows.pop(id)
+            self._removed.add(row)
+            self._total_length -= self._lengths[row]
+        missing = [id for id in ids if id not in self._rows]
+        if missing:
+            try:
+                metadatas = await self.dense_store.metadatas(missing)
+            except NotImplementedError as e:
+                logger.warning(f"Cannot keyword index existing documents: {e}")
+                return 0
+            self.index_texts(missing, [metadata or {} for metadata in metadatas])
+        else:
+            self._maybe_compact()
+        return len(missing)
+
+    async def delete(self, ids: List[str]) -> int:
+        deleted = await self.dense_store.delete(ids)
+        # Deleted rows stay in the postings and are masked out like replaced ones
+        for id in ids:
+            row = self._rows.pop(id, None)
+            if row is not None:
+                self._removed.add(row)
+                self._total_length -= self._lengths[row]
+        self._maybe_compact()
+        return deleted
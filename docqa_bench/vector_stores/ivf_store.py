@@ -0,0 +1,262 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from docqa_bench.vector_stores.numpy_store import NumpyVectorStore, normalize, top_k
+
+
+class IVFVectorStore(NumpyVectorStore):
+    """
+    Approximate nearest-neighbour store using an inverted-file (IVF-flat) index.
+
+    Vectors are partitioned into ``nlist`` clusters by k-means; a query only
+    scans the ``nprobe`` clusters whose centroids are closest to it. Until
+    enough vectors have been added to train the quantiser, searches fall back
+    to exact search. Vectors added after training are assigned to their
+    nearest existing centroid; call ``train`` again to rebuild the clusters.
+    """
+
+    def __init__(self,
+                 metric: str = "cosine",
+                 nlist: int = 100,
+                 nprobe: int = 8,
+                 kmeans_iterations: int = 20,
+                 min_points_per_centroid: int = 39,
+                 max_training_points: Optional[int] = None,
+                 seed: int = 0,
+                 initial_capacity: int = 1024):
+        """
+        :param metric: One of "cosine", "dot" or "l2".
+        :param nlist: Number of k-means clusters (inverted lists).
+        :param nprobe: Number of clusters scanned per query. Can be changed
+            between searches to trade recall for latency.
+        :param kmeans_iterations: Lloyd iterations used when training.
+        :param min_points_per_centroid: The index is trained automatically on
+            the first search once ``nlist * min_points_per_centroid`` vectors
+            are stored.
+        :param max_training_points: Cap on the sample used for k-means.
+            Defaults to ``256 * nlist``.
+        :param seed: Seed for the training sample and centroid initialisation.
+        :param initial_capacity: Number of rows allocated on the first insert.
+        """
+        super().__init__(metric=metric, initial_capacity=initial_capacity)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.min_points_per_centroid = min_points_per_centroid
+        self.max_training_points = max_training_points or 256 * nlist
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._lists: Optional[List[np.ndarray]] = None
+        self._dirty_rows: set = set()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self):
+        """
+        Run k-means over (a sample of) the stored vectors and rebuild the
+        inverted lists.
+        """
+        if self._size == 0:
+            raise ValueError("Cannot train an empty index")
+        rng = np.random.default_rng(self.seed)
+        vectors = self.vectors
+        if len(vectors) > self.max_training_points:
+            vectors = vectors[rng.choice(len(vectors), self.max_training_points, replace=False)]
+        nlist = min(self.nlist, len(vectors))
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignments = self._nearest_centroids(vectors, centroids)
+            counts = np.bincount(assignments, minlength=nlist)
+            empty = counts == 0
+            # Sum each cluster's members over contiguous runs of the sorted assignments
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.zeros_like(centroids)
+            sums[~empty] = np.add.reduceat(vectors[np.argsort(assignments, kind="stable")],
+                                           starts[~empty], axis=0)
+            # Reseed empty clusters from random points instead of dropping them
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            counts[empty] = 1
+            centroids = (sums / counts[:, None]).astype(np.float32)
+            if self.metric == "cosine":
+                centroids = normalize(centroids)
+        self.centroids = centroids
+        self._assignments = self._nearest_centroids(self.vectors, self.centroids)
+        self._dirty_rows.clear()
+        self._build_lists()
+
+    def load_embedding_matrix(self, matrix, metadatas=None):
+        super().load_embedding_matrix(matrix, metadatas)
+        # The previous clusters no longer describe the stored vectors
+        self.centroids = None
+        self._lists = None
+        self._dirty_rows.clear()
+
+    def search_arrays(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k search; see NumpyVectorStore.search_arrays for the
+        return format. Queries with fewer than k candidates in their probed
+        clusters are padded with row -1 and infinite distance.
+        """
+        self._update_index()
+        if not self.is_trained:
+            return self.exact_search_arrays(queries, k)
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, self._size)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        if k <= 0:
+            return rows, distances
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes, _ = top_k(self.distances(queries, self.centroids, self._centroid_norms()), nprobe)
+        for i, query_probes in enumerate(probes):
+            candidates = np.concatenate([self._lists[probe] for probe in query_probes])
+            if not len(candidates):
+                continue
+            candidate_distances = self.distances(queries[i:i + 1], self._vectors[candidates],
+                                                 self._squared_norms[candidates])
+            top_rows, top_distances = top_k(candidate_distances, min(k, len(candidates)))
+            rows[i, :top_rows.shape[1]] = candidates[top_rows[0]]
+            distances[i, :top_rows.shape[1]] = top_distances[0]
+        return rows, distances
+
+    def exact_search_arrays(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return super().search_arrays(queries, k)
+
+    async def search_batch(self, query_vectors: List[List[float]], k: int,
+                           query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        results = await super().search_batch(query_vectors, k)
+        return [[result for result in query_results if np.isfinite(result["score"])]
+                for query_results in results]
+
+    def recall_at_k(self, query_vectors: List[List[float]], k: int) -> Dict[str, float]:
+        """
+        Measure recall@k of the approximate search against exact search.
+
+        :param query_vectors: The queries to evaluate.
+        :param k: The number of results compared per query.
+        :return: Mean recall@k and the mean per-query latency of both searches.
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        self._update_index()
+        start = time.perf_counter()
+        approximate, _ = self.search_arrays(queries, k)
+        approximate_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        exact, _ = self.exact_search_arrays(queries, k)
+        exact_seconds = time.perf_counter() - start
+        recalls = [len(set(found) & set(expected)) / len(expected)
+                   for found, expected in zip(approximate.tolist(), exact.tolist()) if expected]
+        return {
+            "k": k,
+            "nprobe": self.nprobe,
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "ann_latency_ms": 1000 * approximate_seconds / max(len(queries), 1),
+            "exact_latency_ms": 1000 * exact_seconds / max(len(queries), 1),
+        }
+
+    def save(self, path: str):
+        """
+        Persist vectors, metadata and the trained index to a single ``.npz`` file.
+
+        :param path: Destination file path.
+        """
+        self._update_index()
+        params = {
+            "metric": self.metric,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "kmeans_iterations": self.kmeans_iterations,
+            "min_points_per_centroid": self.min_points_per_centroid,
+            "max_training_points": self.max_training_points,
+            "seed": self.seed,
+        }
+        arrays = {
+            "vectors": self.vectors,
+            "ids": np.array(self._ids, dtype=str),
+            "metadatas": np.array(json.dumps(list(self._metadatas))),
+            "params": np.array(json.dumps(params)),
+        }
+        if self.is_trained:
+            arrays["centroids"] = self.centroids
+            arrays["assignments"] = self._assignments[:self._size]
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFVectorStore":
+        """
+        Load a store written by ``save`` without retraining.
+
+        :param path: The ``.npz`` file to read.
+        """
+        with np.load(path) as data:
+            store = cls(**json.loads(str(data["params"])))
+            store.add_arrays(data["ids"].tolist(), data["vectors"],
+                             json.loads(str(data["metadatas"])))
+            if "centroids" in data:
+                store.centroids = data["centroids"]
+                store._assignments = data["assignments"].copy()
+                store._dirty_rows.clear()
+                store._build_lists()
+        return store
+
+    def _compact(self, kept: np.ndarray):
+        if not self.is_trained:
+            # Training assigns every row, so pending rows need no remapping
+            self._dirty_rows.clear()
+            super()._compact(kept)
+            return
+        # Assign pending rows while their row numbers are still valid
+        self._update_index()
+        self._assignments = self._assignments[kept]
+        super()._compact(kept)
+        self._build_lists()
+
+    def _set_rows(self, rows: np.ndarray, vectors: np.ndarray):
+        super()._set_rows(rows, vectors)
+        self._dirty_rows.update(rows.tolist())
+
+    def _update_index(self):
+        if not self.is_trained:
+            if self._size >= self.nlist * self.min_points_per_centroid:
+                self.train()
+            return
+        if not self._dirty_rows:
+            return
+        if len(self._assignments) < self._size:
+            self._assignments = np.resize(self._assignments, len(self._vectors))
+        rows = np.fromiter(self._dirty_rows, dtype=np.int64)
+        self._assignments[rows] = self._nearest_centroids(self._vectors[rows], self.centroids)
+        self._dirty_rows.clear()
+        self._build_lists()
+
+    def _build_lists(self):
+        assignments = self._assignments[:self._size]
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.searchsorted(assignments[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[start:end] for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+    def _nearest_centroids(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        norms = np.einsum("ij,ij->i", centroids, centroids)
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        # Assign in blocks to bound the size of the distance matrix
+        for start in range(0, len(vectors), 4096):
+            block = vectors[start:start + 4096]
+            assignments[start:start + 4096] = np.argmin(
+                self._raw_distances(block, centroids, norms), axis=1)
+        return assignments
+
+    def _centroid_norms(self) -> np.ndarray:
+        return np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    def _raw_distances(self, vectors: np.ndarray, centroids: np.ndarray,
+                       norms: np.ndarray) -> np.ndarray:
+        # Stored vectors are already normalised for cosine, so skip re-normalising
+        scores = vectors @ centroids.T
+        if self.metric == "l2":
+            return np.einsum("ij,ij->i", vectors, vectors)[:, None] + norms[None, :] - 2 * scores
+        return -scores
@@ -0,0 +1,268 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from docqa_bench.core.vector_store import BaseVectorStore
+from docqa_bench.storage.embedding_matrix import EmbeddingMatrix
+
+METRICS = ("cosine", "dot", "l2")
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """
+    In-memory exact-search vector store backed by a contiguous float32 matrix.
+
+    Rows are pre-normalised for cosine similarity, the matrix grows by
+    amortised doubling, and queries (single or batched) are answered with one
+    matrix multiply plus ``argpartition``. Scores are distances in the same
+    convention as ChromaStore, so lower is better: ``1 - cosine`` for "cosine",
+    ``1 - dot`` for "dot" and squared Euclidean distance for "l2".
+    """
+
+    def __init__(self, metric: str = "cosine", initial_capacity: int = 1024):
+        """
+        :param metric: One of "cosine", "dot" or "l2".
+        :param initial_capacity: Number of rows allocated on the first insert.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        self.metric = metric
+        self.initial_capacity = max(1, initial_capacity)
+        self._vectors: Optional[np.ndarray] = None
+        self._squared_norms: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadatas: List[dict] = []
+        self._rows: Dict[str, int] = {}
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        The stored (possibly normalised) vectors, one row per document.
+        """
+        if self._vectors is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._vectors[:self._size]
+
+    async def add(self, id: str, vector: List[float], metadata: dict):
+        self.add_arrays([id], np.asarray([vector], dtype=np.float32), [metadata])
+
+    async def _add_batch(self, ids: List[str], vectors: List[List[float]],
+                         metadatas: List[dict]):
+        self.add_arrays(ids, np.asarray(vectors, dtype=np.float32), metadatas)
+
+    def add_arrays(self, ids: List[str], vectors: np.ndarray, metadatas: List[dict]):
+        """
+        Insert or replace documents from a 2-D array of vectors.
+
+        :param ids: Unique identifiers for the documents.
+        :param vectors: Array of shape (len(ids), dimension).
+        :param metadatas: Metadata dictionaries, one per id.
+        """
+        vectors = self._prepare(vectors)
+        if len(vectors) != len(ids) or len(metadatas) != len(ids):
+            raise ValueError("ids, vectors and metadatas must have the same length")
+        if self._vectors is None:
+            self._allocate(max(self.initial_capacity, len(ids)), vectors.shape[1])
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, "
+                             f"got {vectors.shape[1]}")
+        elif not self._vectors.flags.writeable:
+            # Copy a memory-mapped matrix into memory before the first write
+            self._vectors = np.array(self._vectors)
+        if not isinstance(self._metadatas, list):
+            # Likewise decode the metadata of a loaded matrix
+            self._metadatas = list(self._metadatas)
+
+        new_rows = []
+        # Later duplicates of an id replace earlier ones, as for existing ids
+        for id, i in {id: i for i, id in enumerate(ids)}.items():
+            row = self._rows.get(id)
+            if row is None:
+                self._rows[id] = self._size + len(new_rows)
+                self._ids.append(id)
+                self._metadatas.append(metadatas[i])
+                new_rows.append(i)
+            else:
+                self._metadatas[row] = metadatas[i]
+                self._set_rows(np.array([row]), vectors[i:i + 1])
+        if new_rows:
+            self._ensure_capacity(self._size + len(new_rows))
+            rows = np.arange(self._size, self._size + len(new_rows))
+            self._set_rows(rows, vectors[new_rows])
+            self._size += len(new_rows)
+
+    @classmethod
+    def from_embedding_matrix(cls, matrix: EmbeddingMatrix,
+                              metadatas: Optional[List[dict]] = None,
+                              **kwargs) -> "NumpyVectorStore":
+        """
+        Create a store holding the rows of an EmbeddingMatrix.
+
+        :param matrix: The matrix to load.
+        :param metadatas: Metadata per row; defaults to the matrix's own.
+        :param kwargs: Passed to the store's constructor.
+        """
+        store = cls(**kwargs)
+        store.load_embedding_matrix(matrix, metadatas)
+        return store
+
+    def load_embedding_matrix(self, matrix: EmbeddingMatrix,
+                              metadatas: Optional[List[dict]] = None):
+        """
+        Replace the store's contents with the rows of an EmbeddingMatrix.
+
+        float32 matrices are searched in place, without copying, unless the
+        metric is cosine and the matrix was not written normalised. float16 and
+        int8 matrices are dequantised into memory. The first later write copies
+        a memory-mapped matrix into memory.
+
+        :param matrix: The matrix to load.
+        :param metadatas: Metadata per row; defaults to the matrix's own.
+        """
+        metadatas = metadatas or matrix.metadatas or [{} for _ in matrix.ids]
+        if len(metadatas) != len(matrix):
+            raise ValueError("metadatas must contain one entry per matrix row")
+        vectors = matrix.to_float32()
+        if self.metric == "cosine" and not matrix.normalized:
+            vectors = normalize(vectors)
+        self._vectors = vectors
+        if self.metric == "l2":
+            self._squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+        else:
+            # Only the l2 metric reads the norms
+            self._squared_norms = np.zeros(len(vectors), dtype=np.float32)
+        self._size = len(matrix)
+        self._ids = list(matrix.ids)
+        # A matrix's metadata is decoded lazily, row by row as results are returned
+        self._metadatas = metadatas
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+
+    async def search(self, query_vector: List[float], k: int) -> List[Dict]:
+        return (await self.search_batch([query_vector], k))[0]
+
+    async def search_batch(self, query_vectors: List[List[float]], k: int,
+                           query_texts: Optional[List[str]] = None) -> List[List[Dict]]:
+        if not len(query_vectors):
+            return []
+        rows, distances = self.search_arrays(np.asarray(query_vectors, dtype=np.float32), k)
+        return [[{
+            "id": self._ids[row],
+            "score": float(distance),
+            "metadata": self._metadatas[row],
+        } for row, distance in zip(query_rows, query_distances)]
+                for query_rows, query_distances in zip(rows, distances)]
+
+    def search_arrays(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k search for a 2-D array of queries.
+
+        :param queries: Array of shape (n_queries, dimension).
+        :param k: The number of closest results to return per query.
+        :return: Row indices and distances, each of shape (n_queries, min(k, count)),
+            sorted by increasing distance.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, self._size)
+        if k <= 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        distances = self.distances(queries, self.vectors, self._squared_norms[:self._size])
+        return top_k(distances, k)
+
+    def distances(self, queries: np.ndarray, vectors: np.ndarray,
+                  squared_norms: np.ndarray) -> np.ndarray:
+        """
+        Distance matrix of shape (len(queries), len(vectors)) for this store's metric.
+        """
+        if self.metric == "cosine":
+            queries = normalize(queries)
+        scores = queries @ vectors.T
+        if self.metric == "l2":
+            query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+            return np.maximum(query_norms + squared_norms[None, :] - 2 * scores, 0)
+        return 1 - scores
+
+    async def count(self) -> int:
+        return self._size
+
+    async def ids(self) -> List[str]:
+        return list(self._ids)
+
+    async def metadatas(self, ids: List[str]) -> List[Optional[dict]]:
+        return [self._metadatas[self._rows[id]] if id in self._rows else None for id in ids]
+
+    async def delete(self, ids: List[str]) -> int:
+        return self.delete_ids(ids)
+
+    def delete_ids(self, ids: List[str]) -> int:
+        """
+        Remove documents, compacting the remaining rows in one pass.
+
+        :param ids: The ids to delete; unknown ids are ignored.
+        :return: The number of documents that were deleted.
+        """
+        rows = {self._rows[id] for id in ids if id in self._rows}
+        if not rows:
+            return 0
+        keep = np.ones(self._size, dtype=bool)
+        keep[list(rows)] = False
+        if not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors)
+        self._compact(np.flatnonzero(keep))
+        return len(rows)
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return normalize(vectors) if self.metric == "cosine" else vectors
+
+    def _allocate(self, capacity: int, dimension: int):
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._squared_norms = np.zeros(capacity, dtype=np.float32)
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        vectors, squared_norms = self._vectors, self._squared_norms
+        self._allocate(capacity, vectors.shape[1])
+        self._vectors[:self._size] = vectors[:self._size]
+        self._squared_norms[:self._size] = squared_norms[:self._size]
+
+    def _compact(self, kept: np.ndarray):
+        # Move the kept rows, in order, to the front of the matrix
+        size = len(kept)
+        self._vectors[:size] = self._vectors[kept]
+        self._squared_norms[:size] = self._squared_norms[kept]
+        self._ids = [self._ids[row] for row in kept]
+        self._metadatas = [self._metadatas[row] for row in kept]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._size = size
+
+    def _set_rows(self, rows: np.ndarray, vectors: np.ndarray):
+        self._vectors[rows] = vectors
+        self._squared_norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k(distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and values of the k smallest entries in each row, sorted ascending.
+    """
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+    candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+    order = np.argsort(candidate_distances, axis=1, kind="stable")
+    return (np.take_along_axis(candidates, order, axis=1),
+            np.take_along_axis(candidate_distances, order, axis=1))
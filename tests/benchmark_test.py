@@ -1,8 +1,19 @@
+import asyncio
 import pytest
 import uuid
 from docqa_bench import (
+    BaseAnswerGenerator,
+    BaseEvaluator,
+    BaseQuestionGenerator,
+    CachedEmbedder,
     Benchmark,
+    CorpusBenchmark,
+    NumpyVectorStore,
     PreprocessedDocument,
+    TextFileDocument,
+    RecursiveTextSplitter,
+    ReferenceAnswerStore,
+    SemanticSimilarityEvaluator,
     SimpleChunker,
     OpenAIEmbedder,
     ChromaStore,
@@ -10,6 +21,7 @@ from docqa_bench import (
     OpenAIAnswerGenerator,
     F1Evaluator,
 )
+from conftest import StubEmbedder
 
 # Mock data
 SAMPLE_TEXT = "The quick brown fox jumps over the lazy dog. This is a sample text for testing purposes."
@@ -89,6 +101,52 @@ async def test_simple_chunker(chunker):
     assert all(len(chunk) <= 20 for chunk in chunks)
 
 
+@pytest.mark.asyncio
+async def test_text_file_document_streams_blocks(tmp_path):
+    path = tmp_path / "document.txt"
+    path.write_text(SAMPLE_TEXT)
+    document = TextFileDocument(str(path))
+    blocks = [block async for block in document.iter_content(block_size=10)]
+    assert all(len(block) <= 10 for block in blocks)
+    assert "".join(blocks) == await document.get_content() == SAMPLE_TEXT
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("block_size", [1, 16, 100])
+@pytest.mark.parametrize("stream_window", [1, 40, 300])
+async def test_simple_chunker_iter_chunks(block_size, stream_window):
+    paragraphs = [SAMPLE_TEXT, SAMPLE_TEXT[:30], SAMPLE_TEXT * 3 + "\n" + SAMPLE_TEXT, "Short."]
+    text = "\n\n".join(paragraphs * 5)
+    chunker = SimpleChunker(chunk_size=40, chunk_overlap=15, stream_window=stream_window)
+    document = PreprocessedDocument(text)
+    streamed = [chunk async for chunk in chunker.iter_chunks(document.iter_content(block_size=block_size))]
+    # Streaming yields exactly the chunks of splitting the whole text at once
+    assert streamed == await chunker.chunk(text)
+    # Also without paragraph breaks, where the whole text is buffered
+    document = PreprocessedDocument(SAMPLE_TEXT)
+    streamed = [chunk async for chunk in chunker.iter_chunks(document.iter_content(block_size=block_size))]
+    assert streamed == await chunker.chunk(SAMPLE_TEXT)
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(20, 5), (7, 0), (30, 30)])
+def test_recursive_splitter_matches_langchain(chunk_size, chunk_overlap):
+    text_splitter = pytest.importorskip("langchain.text_splitter")
+    text = (SAMPLE_TEXT + "\n\n" + SAMPLE_ANSWER + "\n  \n" + "x" * 45) * 3
+    expected = text_splitter.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+    splitter = RecursiveTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    assert splitter.split_text(text) == expected
+    assert [text[start:end] for start, end in splitter.split_spans(text)] == expected
+
+
+def test_recursive_splitter_custom_length_function():
+    splitter = RecursiveTextSplitter(chunk_size=4, chunk_overlap=1,
+                                     length_function=lambda text: len(text.split()))
+    chunks = splitter.split_text(SAMPLE_TEXT)
+    assert all(len(chunk.split()) <= 4 for chunk in chunks)
+    assert chunks[0] == "The quick brown fox"
+
+
 @pytest.mark.asyncio
 async def test_openai_embedder(embedder):
     embedding = await embedder.embed(SAMPLE_TEXT)
@@ -106,6 +164,34 @@ async def test_chroma_store(vector_store):
     assert results[0]["metadata"]["text"] == SAMPLE_TEXT
 
 
+@pytest.mark.asyncio
+async def test_chroma_store_search_batch(vector_store):
+    await vector_store.add("a", [1.0, 0.0], {"text": "a"})
+    await vector_store.add("b", [0.0, 1.0], {"text": "b"})
+    results = await vector_store.search_batch([[0.0, 1.0], [1.0, 0.0]], k=1)
+    assert [[r["id"] for r in result] for result in results] == [["b"], ["a"]]
+
+
+@pytest.mark.asyncio
+async def test_chroma_store_add_many(vector_store):
+    added = await vector_store.add_many(
+        [f"id_{i}" for i in range(5)],
+        [[float(i), 1.0] for i in range(5)],
+        [{"text": f"text {i}"} for i in range(5)],
+        batch_size=2,
+    )
+    assert added == 5
+    assert await vector_store.count() == 5
+
+    # A failing batch (mismatched dimension) is skipped without losing the others
+    added = await vector_store.add_many(
+        ["bad", "id_5"], [[1.0, 2.0, 3.0], [5.0, 1.0]], [{"text": "bad"}, {"text": "ok"}],
+        batch_size=1,
+    )
+    assert added == 1
+    assert await vector_store.count() == 6
+
+
 @pytest.mark.asyncio
 async def test_openai_question_generator(question_generator):
     questions = await question_generator.generate(SAMPLE_TEXT, n=1)
@@ -130,6 +216,49 @@ async def test_f1_evaluator(evaluator):
     assert 0 < score < 1  # Partial match should give a score between 0 and 1
 
 
+@pytest.mark.asyncio
+async def test_f1_evaluator_squad_normalisation(evaluator):
+    # Case, punctuation and articles are ignored
+    assert await evaluator.evaluate("A Fox, jumping!", "the fox jumping") == 1.0
+    # Repeated tokens only match as often as they occur in the reference
+    assert await evaluator.evaluate("fox fox", "fox dog") == pytest.approx(0.5)
+    assert await evaluator.evaluate("", "") == 1.0
+    assert await evaluator.evaluate("the", "fox") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_f1_evaluator_batch_matches_evaluate(evaluator):
+    generated = ["The fox jumps", SAMPLE_ANSWER, "", "dog dog dog"]
+    references = [SAMPLE_ANSWER, SAMPLE_ANSWER, "fox", "the lazy dog"]
+    expected = [await evaluator.evaluate(g, r) for g, r in zip(generated, references)]
+    assert await evaluator.evaluate_batch(generated, references) == expected
+    # The default implementation of BaseEvaluator gives the same scores
+    assert await BaseEvaluator.evaluate_batch(evaluator, generated, references) == expected
+    with pytest.raises(ValueError):
+        await evaluator.evaluate_batch(generated, references[:1])
+
+
+def _keyword_vector(text):
+    # Whether the text mentions a fox or a dog
+    return [float("fox" in text), float("dog" in text)]
+
+
+@pytest.mark.asyncio
+async def test_semantic_similarity_evaluator_batches_embeddings():
+    embedder = StubEmbedder(_keyword_vector)
+    evaluator = SemanticSimilarityEvaluator(CachedEmbedder(embedder))
+    generated = ["A fox leaps", "A dog sleeps", "", "A fox leaps"]
+    references = ["The fox jumps", "The fox jumps", "", "The dog and the fox"]
+    scores = await evaluator.evaluate_batch(generated, references)
+    assert scores == pytest.approx([1.0, 0.0, 1.0, 2 ** -0.5])
+    # One request for the distinct non-empty answers
+    assert embedder.calls == [["A fox leaps", "A dog sleeps", "The fox jumps", "The dog and the fox"]]
+
+    # Answers seen before come from the embedding cache
+    assert await evaluator.evaluate("A dog sleeps", "The dog and the fox") == pytest.approx(2 ** -0.5)
+    assert len(embedder.calls) == 1
+
+
 @pytest.mark.asyncio
 async def test_benchmark_run(benchmark):
     results = await benchmark.run()
@@ -167,3 +296,142 @@ async def test_full_pipeline(benchmark):
         assert "reference_answer" in result
         assert "score" in result
         assert 0 <= result["score"] <= 1
+
+
+# Offline components for exercising the pipeline without network access
+class _StubQuestionGenerator(BaseQuestionGenerator):
+    async def generate(self, context, n):
+        return [f"Question {i}?" for i in range(n)]
+
+
+class _SlowAnswerGenerator(BaseAnswerGenerator):
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate(self, question, context):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return question
+
+
+@pytest.mark.asyncio
+async def test_benchmark_bounded_concurrency(document, chunker, vector_store, evaluator):
+    answer_generator = _SlowAnswerGenerator()
+    benchmark = Benchmark(
+        document,
+        chunker,
+        StubEmbedder(),
+        vector_store,
+        _StubQuestionGenerator(),
+        answer_generator,
+        evaluator,
+        max_concurrency=2,
+    )
+    results = await benchmark.run()
+    assert [result["question"] for result in results] == [f"Question {i}?" for i in range(10)]
+    # Two questions in flight, each overlapping its RAG and reference answers
+    assert answer_generator.peak == 4
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reuses_reference_answers(document, chunker, evaluator, tmp_path):
+    reference_store = ReferenceAnswerStore()
+
+    async def run():
+        answer_generator = _SlowAnswerGenerator()
+        benchmark = Benchmark(
+            document,
+            chunker,
+            StubEmbedder(),
+            ChromaStore(f"test_collection_{uuid.uuid4().hex}"),
+            _StubQuestionGenerator(),
+            answer_generator,
+            evaluator,
+            reference_store=reference_store,
+        )
+        await benchmark.run()
+        return answer_generator
+
+    assert (await run()).calls == 20
+    assert len(reference_store) == 10
+
+    golden_set = str(tmp_path / "golden.json")
+    reference_store.export_golden_set(golden_set)
+    reference_store = ReferenceAnswerStore.from_golden_set(golden_set)
+    # Only the RAG answers are generated once the reference answers are known
+    assert (await run()).calls == 10
+
+
+@pytest.mark.asyncio
+async def test_benchmark_ingest_streams_batches(chunker, vector_store, evaluator):
+    text = " ".join([SAMPLE_TEXT] * 20)
+    benchmark = Benchmark(
+        PreprocessedDocument(text),
+        chunker,
+        StubEmbedder(),
+        vector_store,
+        _StubQuestionGenerator(),
+        _SlowAnswerGenerator(),
+        evaluator,
+        ingest_batch_size=7,
+    )
+    added = await benchmark.ingest()
+    assert added == len(await chunker.chunk(text))
+    assert await vector_store.count() == added
+
+
+@pytest.mark.asyncio
+async def test_corpus_benchmark_shares_one_store(chunker, evaluator):
+    documents = [PreprocessedDocument(f"Document {i}. " + SAMPLE_TEXT * (i + 1)) for i in range(3)]
+    vector_store = NumpyVectorStore()
+    answer_generator = _SlowAnswerGenerator()
+    output = await CorpusBenchmark.evaluate_corpus(
+        documents,
+        chunker,
+        StubEmbedder(),
+        vector_store,
+        _StubQuestionGenerator(),
+        answer_generator,
+        evaluator,
+        document_ids=["a", "b", "c"],
+        questions_per_document=4,
+        processes=0,
+    )
+    results = output["results"]
+    assert [result["document_id"] for result in results] == ["a"] * 4 + ["b"] * 4 + ["c"] * 4
+    assert all(len(result["retrieved_document_ids"]) == 3 for result in results)
+    assert answer_generator.calls == 24
+
+    metadata = output["metadata"]
+    expected_chunks = 0
+    for document in documents:
+        expected_chunks += len(await chunker.chunk(await document.get_content()))
+    assert metadata["num_chunks"] == expected_chunks
+    assert set(metadata["documents"]) == {"a", "b", "c"}
+    assert metadata["documents"]["a"]["num_questions"] == 4
+    assert metadata["aggregate"]["num_questions"] == 12
+    assert metadata["aggregate"]["num_documents"] == 3
+    # The stub answers every question with itself, so every score is perfect
+    assert metadata["aggregate"]["mean_score"] == pytest.approx(1.0)
+    assert metadata["aggregate"]["macro_mean_score"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_corpus_benchmark_evaluates_scraped_content(chunker, evaluator):
+    output = await CorpusBenchmark.evaluate_scraped_content(
+        SAMPLE_TEXT,
+        chunker,
+        StubEmbedder(),
+        NumpyVectorStore(),
+        _StubQuestionGenerator(),
+        _SlowAnswerGenerator(),
+        evaluator,
+    )
+    assert output["input_content"] == SAMPLE_TEXT
+    assert output["metadata"]["aggregate"]["num_documents"] == 1
+    assert all(result["source_retrieved"] for result in output["results"])
@@ -0,0 +1,62 @@
+import pytest
+from docqa_bench import (
+    BaseAnswerGenerator,
+    CachedAnswerGenerator,
+    CachedEmbedder,
+    ResponseCache,
+)
+from conftest import StubEmbedder
+
+
+@pytest.mark.asyncio
+async def test_cached_embedder_memory_hits():
+    inner = StubEmbedder(model="counting-model")
+    embedder = CachedEmbedder(inner)
+    first = await embedder.embed_batch(["a", "bb", "a"])
+    second = await embedder.embed_batch(["bb", "ccc"])
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert inner.texts == ["a", "bb", "ccc"]
+    assert embedder.stats()["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cached_embedder_persists_to_disk(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    await CachedEmbedder(StubEmbedder(model="counting-model"), path=path).embed_batch(["a", "bb"])
+
+    inner = StubEmbedder(model="counting-model")
+    embedder = CachedEmbedder(inner, path=path)
+    assert await embedder.embed("bb") == [2.0, 1.0]
+    assert inner.texts == []
+    assert embedder.hits == 1 and embedder.misses == 0
+
+
+class CountingAnswerGenerator(BaseAnswerGenerator):
+    model = "counting-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, question, context):
+        self.calls += 1
+        return f"{question} {context}"
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_generator_record_and_replay(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    inner = CountingAnswerGenerator()
+    recorder = CachedAnswerGenerator(inner, ResponseCache(path), mode="record")
+    assert await recorder.generate("q", "c") == "q c"
+    assert await recorder.generate("q", "c") == "q c"
+    assert inner.calls == 1
+
+    replayer = CachedAnswerGenerator(CountingAnswerGenerator(), ResponseCache(path), mode="replay")
+    assert await replayer.generate("q", "c") == "q c"
+    with pytest.raises(KeyError):
+        await replayer.generate("q", "other context")
+
+    passthrough = CachedAnswerGenerator(inner, ResponseCache(path), mode="passthrough")
+    await passthrough.generate("q", "c")
+    assert inner.calls == 2
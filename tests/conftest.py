@@ -0,0 +1,37 @@
+from typing import Callable, Iterable, List, Optional
+from docqa_bench import BaseEmbedder
+
+
+def length_vector(text: str) -> List[float]:
+    return [float(len(text)), 1.0]
+
+
+class StubEmbedder(BaseEmbedder):
+    """
+    Offline embedder mapping every text to a fixed vector and recording calls.
+
+    :param vectorize: Maps a text to its vector; by default its length and 1.
+    :param failing: Texts embedded as an empty vector, as embedders report
+        texts they failed to embed.
+    :param model: The model name reported to the pipeline, if any.
+    """
+
+    def __init__(self,
+                 vectorize: Callable[[str], List[float]] = length_vector,
+                 failing: Iterable[str] = (),
+                 model: Optional[str] = None):
+        self.vectorize = vectorize
+        self.failing = set(failing)
+        if model is not None:
+            self.model = model
+        # Every embedded text, and the texts of every embed_batch call
+        self.texts: List[str] = []
+        self.calls: List[List[str]] = []
+
+    async def embed(self, text):
+        return (await self.embed_batch([text]))[0]
+
+    async def embed_batch(self, texts):
+        self.texts.extend(texts)
+        self.calls.append(list(texts))
+        return [[] if text in self.failing else self.vectorize(text) for text in texts]
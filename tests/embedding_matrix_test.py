@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from docqa_bench import (
+    EmbeddingMatrix,
+    EmbeddingMatrixWriter,
+    NumpyVectorStore,
+    embed_to_matrix,
+)
+from conftest import StubEmbedder
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(20, 16)).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype,tolerance", [("float32", 0), ("float16", 1e-2), ("int8", 5e-2)])
+def test_embedding_matrix_round_trip(tmp_path, vectors, dtype, tolerance):
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    with EmbeddingMatrixWriter(str(tmp_path), dtype=dtype, model="test-model") as writer:
+        writer.write(ids[:7], vectors[:7])
+        writer.write(ids[7:], vectors[7:])
+
+    matrix = EmbeddingMatrix(str(tmp_path))
+    assert list(matrix.ids) == ids
+    assert matrix.ids[-1] == ids[-1] and matrix.ids[2:4] == ids[2:4]
+    assert matrix.metadatas is None
+    assert matrix.model == "test-model"
+    assert matrix.data.dtype == np.dtype(dtype)
+    np.testing.assert_allclose(matrix.to_float32(), vectors, atol=tolerance)
+    np.testing.assert_allclose(matrix.to_float32([3, 5]), vectors[[3, 5]], atol=tolerance)
+
+
+@pytest.mark.asyncio
+async def test_numpy_store_loads_matrix_without_copying(tmp_path, vectors):
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    matrix = EmbeddingMatrix.write(str(tmp_path), ids, vectors, normalize=True,
+                                   metadatas=[{"text": id} for id in ids])
+    store = NumpyVectorStore.from_embedding_matrix(matrix)
+    assert np.shares_memory(store.vectors, matrix.data)
+    result = await store.search(vectors[4].tolist(), k=1)
+    assert result[0]["id"] == "chunk_4"
+    assert result[0]["metadata"] == {"text": "chunk_4"}
+
+    # Writes copy the read-only mapping into memory first
+    await store.add("extra", vectors[0].tolist(), {"text": "extra"})
+    assert await store.count() == len(vectors) + 1
+
+
+@pytest.mark.asyncio
+async def test_embed_to_matrix_skips_failed_embeddings(tmp_path):
+    matrix = await embed_to_matrix(StubEmbedder(failing=["fail"]), str(tmp_path), ["a", "b", "c"],
+                                   ["x", "fail", "yyy"], batch_size=2, store_texts=True)
+    assert list(matrix.ids) == ["a", "c"]
+    assert list(matrix.metadatas) == [{"text": "x"}, {"text": "yyy"}]
+    np.testing.assert_allclose(matrix.to_float32(), [[1.0, 1.0], [3.0, 1.0]])
+
+
+def test_embedding_matrix_index_does_not_hold_rows(tmp_path, vectors):
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    EmbeddingMatrix.write(str(tmp_path), ids, vectors, metadatas=[{"text": "x" * 1000} for _ in ids])
+    # Ids and metadata live in their own files and are decoded on access
+    assert (tmp_path / "index.json").stat().st_size < 200
+    matrix = EmbeddingMatrix(str(tmp_path))
+    assert len(matrix) == len(ids)
+    assert matrix.metadatas[7] == {"text": "x" * 1000}
+    with pytest.raises(IndexError):
+        matrix.ids[len(ids)]
+
+    empty = EmbeddingMatrix.write(str(tmp_path / "empty"), [], np.empty((0, 16)))
+    assert len(empty) == 0 and list(empty.ids) == []
@@ -0,0 +1,185 @@
+import pytest
+from docqa_bench import (
+    BaseChunker,
+    Benchmark,
+    CorpusIngestor,
+    NumpyVectorStore,
+    PreprocessedDocument,
+    SimpleChunker,
+    TextFileDocument,
+)
+from docqa_bench.ingestion import chunk_id
+from conftest import StubEmbedder
+
+PARAGRAPH = "The quick brown fox jumps over the lazy dog.\n\nThis is a sample text for testing purposes."
+
+
+class _SentenceChunker(BaseChunker):
+    async def chunk(self, text):
+        return [sentence.strip() + "." for sentence in text.split(".") if sentence.strip()]
+
+
+@pytest.fixture
+def documents(tmp_path):
+    documents = []
+    for i in range(3):
+        path = tmp_path / f"document_{i}.txt"
+        path.write_text(f"Document {i}.\n\n" + PARAGRAPH * (i + 1))
+        documents.append(TextFileDocument(str(path)))
+    documents.append(PreprocessedDocument(PARAGRAPH))
+    return documents
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("processes", [0, 2])
+async def test_corpus_ingestor_records_provenance(documents, processes):
+    chunker = SimpleChunker(chunk_size=30, chunk_overlap=5)
+    store = NumpyVectorStore()
+    ingestor = CorpusIngestor(chunker, StubEmbedder(), store, processes=processes, batch_size=4)
+
+    added = await ingestor.ingest(documents)
+
+    stored = {(metadata["document_id"], metadata["chunk_index"]): (id, metadata)
+              for id, metadata in zip(store._ids, store._metadatas)}
+    expected = 0
+    for i, document in enumerate(documents):
+        content = await document.get_content()
+        chunks = await chunker.chunk(content)
+        expected += len(chunks)
+        document_id = CorpusIngestor.document_id(document, i)
+        occurrences = {}
+        for index, chunk in enumerate(chunks):
+            id, metadata = stored[document_id, index]
+            assert id == f"{document_id}#{chunk_id(chunk, occurrences)}"
+            assert content[metadata["start"]:metadata["end"]] == chunk == metadata["text"]
+    assert added == expected == await store.count()
+    assert CorpusIngestor.document_id(documents[-1], 3) == "doc_3"
+
+
+@pytest.mark.asyncio
+async def test_corpus_ingestor_locates_chunks_without_spans(documents, tmp_path):
+    missing = TextFileDocument(str(tmp_path / "missing.txt"))
+    store = NumpyVectorStore()
+    ingestor = CorpusIngestor(_SentenceChunker(), StubEmbedder(), store, processes=0)
+
+    records = [record async for record in ingestor.iter_chunks([documents[0], missing], ["a", "b"])]
+
+    content = await documents[0].get_content()
+    # The unreadable document is skipped
+    assert {metadata["document_id"] for _, _, metadata in records} == {"a"}
+    for _, text, metadata in records:
+        assert content[metadata["start"]:metadata["end"]] == text
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reingests_only_changed_chunks():
+    paragraphs = [f"Paragraph {i} talks about topic number {i}." for i in range(8)]
+    embedder = StubEmbedder()
+    store = NumpyVectorStore()
+
+    async def ingest(document_paragraphs):
+        benchmark = Benchmark(PreprocessedDocument("\n\n".join(document_paragraphs)),
+                              SimpleChunker(chunk_size=60, chunk_overlap=0), embedder, store,
+                              None, None, None, ingest_batch_size=3, incremental=True)
+        await benchmark.ingest()
+        return benchmark.ingest_changes
+
+    assert await ingest(paragraphs) == {"added": 8, "deleted": 0, "unchanged": 0, "failed": 0}
+    # Ids are content hashes, so an unchanged document costs no embeddings
+    embedder.texts.clear()
+    assert await ingest(paragraphs) == {"added": 0, "deleted": 0, "unchanged": 8, "failed": 0}
+    assert embedder.texts == []
+
+    edited = paragraphs[:2] + ["A new paragraph was inserted here."] + paragraphs[2:6] \
+        + ["Paragraph 7 was rewritten."]
+    assert await ingest(edited) == {"added": 2, "deleted": 2, "unchanged": 6, "failed": 0}
+    assert embedder.texts == ["A new paragraph was inserted here.", "Paragraph 7 was rewritten."]
+    assert sorted(metadata["text"] for metadata in store._metadatas) == sorted(edited)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_skips_ingestion_when_manifest_matches(tmp_path):
+    from docqa_bench import ChromaStore
+    path = str(tmp_path / "chroma")
+    embedder = StubEmbedder()
+    text = "\n\n".join(f"Paragraph {i} talks about topic number {i}." for i in range(8))
+
+    async def ingest(content, chunk_size=60):
+        benchmark = Benchmark(PreprocessedDocument(content),
+                              SimpleChunker(chunk_size=chunk_size, chunk_overlap=0), embedder,
+                              ChromaStore("index", path=path), None, None, None,
+                              incremental=True)
+        embedder.texts.clear()
+        await benchmark.ingest()
+        return benchmark
+
+    benchmark = await ingest(text)
+    assert len(embedder.texts) == 8
+    manifest = await benchmark.vector_store.get_manifest()
+    assert manifest == {**await benchmark.index_manifest(), "dimension": 2, "complete": True}
+    assert manifest["chunker"]["chunk_size"] == 60
+    assert manifest["chunker"]["length_function"] == "builtins.len"
+
+    # A new process attaching to the same index does no ingestion work
+    benchmark = await ingest(text)
+    assert embedder.texts == []
+    assert benchmark.ingest_changes == {"added": 0, "deleted": 0, "unchanged": 8, "failed": 0}
+
+    # Changed content is ingested incrementally
+    benchmark = await ingest(text + "\n\nOne more paragraph.")
+    assert embedder.texts == ["One more paragraph."]
+
+    # Another chunking cannot reuse any vectors
+    benchmark = await ingest(text, chunk_size=200)
+    assert benchmark.ingest_changes["unchanged"] == 0
+    assert await benchmark.vector_store.count() == len(embedder.texts)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_rebuilds_incomplete_or_replaced_index(tmp_path):
+    from docqa_bench import ChromaStore
+    path = str(tmp_path / "chroma")
+    embedder = StubEmbedder()
+    paragraphs = [f"Paragraph {i} talks about topic number {i}." for i in range(8)]
+
+    async def ingest(document_paragraphs, incremental=False):
+        benchmark = Benchmark(PreprocessedDocument("\n\n".join(document_paragraphs)),
+                              SimpleChunker(chunk_size=60, chunk_overlap=0), embedder,
+                              ChromaStore("index", path=path), None, None, None,
+                              incremental=incremental)
+        embedder.texts.clear()
+        await benchmark.ingest()
+        return benchmark
+
+    # A chunk that could not be embedded leaves the index marked incomplete
+    embedder.failing = {paragraphs[3]}
+    benchmark = await ingest(paragraphs, incremental=True)
+    assert benchmark.ingest_changes["failed"] == 1
+    assert (await benchmark.vector_store.get_manifest())["complete"] is False
+
+    # So the next run ingests the missing chunk instead of skipping
+    embedder.failing = set()
+    benchmark = await ingest(paragraphs, incremental=True)
+    assert embedder.texts == [paragraphs[3]]
+    assert (await benchmark.vector_store.get_manifest())["complete"] is True
+
+    # Without incremental ingestion, changed content replaces the old chunks
+    benchmark = await ingest(paragraphs[:4] + ["Paragraph 4 was rewritten."])
+    assert len(embedder.texts) == 5
+    assert await benchmark.vector_store.count() == 5
+    assert (await benchmark.vector_store.get_manifest())["complete"] is True
+
+
+@pytest.mark.asyncio
+async def test_benchmark_refuses_collection_with_foreign_records():
+    import uuid
+    from docqa_bench import ChromaStore
+    name = f"shared_{uuid.uuid4().hex}"
+    await ChromaStore(name).add("user-doc", [1.0, 1.0], {"text": "Written by someone else."})
+
+    benchmark = Benchmark(PreprocessedDocument("Paragraph 0 talks about topic number 0."),
+                          SimpleChunker(chunk_size=60, chunk_overlap=0), StubEmbedder(),
+                          ChromaStore(name), None, None, None)
+    with pytest.raises(ValueError):
+        await benchmark.ingest()
+    assert await ChromaStore(name).ids() == ["user-doc"]
@@ -0,0 +1,73 @@
+import time
+import numpy as np
+import pytest
+from docqa_bench import (
+    Benchmark,
+    ExtractiveAnswerGenerator,
+    ExtractiveQuestionGenerator,
+    F1Evaluator,
+    HashingEmbedder,
+    NumpyVectorStore,
+    SimpleChunker,
+)
+
+TEXT = (
+    "The quick brown fox jumps over the lazy dog. Cats sleep for most of the day. "
+    "Error code E1234 means that the disk is full. Paris is the capital of France.\n\n"
+    "Rivers flow from the mountains to the sea. The library opens at nine every morning."
+)
+
+
+@pytest.mark.asyncio
+async def test_hashing_embedder_is_deterministic():
+    embedder = HashingEmbedder(dimension=64, ngram_range=(1, 2))
+    vectors = np.array(await embedder.embed_batch(["the quick fox", "The quick FOX!", "tax returns"]))
+    assert vectors.shape == (3, 64)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1)
+    assert np.allclose(vectors[0], vectors[1])
+    assert vectors[0] @ vectors[2] < 0.5
+    # A fresh instance (e.g. in another process) produces the same vectors
+    assert np.allclose(await HashingEmbedder(dimension=64, ngram_range=(1, 2)).embed("the quick fox"),
+                       vectors[0])
+    assert await embedder.embed("") == [0.0] * 64
+
+
+@pytest.mark.asyncio
+async def test_extractive_generators():
+    questions = await ExtractiveQuestionGenerator().generate(TEXT, n=3)
+    assert len(questions) == 3
+    assert questions[0] == "What does the text say about: The quick brown fox jumps over the lazy dog?"
+    assert await ExtractiveQuestionGenerator().generate(TEXT, n=3) == questions
+    assert len(await ExtractiveQuestionGenerator().generate("One sentence.", n=5)) == 1
+    # Asking for more questions than sentences asks about every sentence once
+    questions = await ExtractiveQuestionGenerator().generate(TEXT, n=10)
+    assert len(questions) == len(set(questions)) == 6
+    assert questions[-1] == "What does the text say about: The library opens at nine every morning?"
+
+    answer = await ExtractiveAnswerGenerator().generate("What does error code E1234 mean?", TEXT)
+    assert answer == "Error code E1234 means that the disk is full."
+
+
+@pytest.mark.asyncio
+async def test_simulated_latency():
+    generator = ExtractiveAnswerGenerator(latency=0.02, jitter=0.01, seed=0)
+    start = time.perf_counter()
+    await generator.generate("fox", TEXT)
+    assert 0.02 <= time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_offline_pipeline():
+    output = await Benchmark.evaluate_scraped_content(
+        TEXT,
+        # The overlap is longer than any sentence, so each one is whole in some chunk
+        SimpleChunker(chunk_size=80, chunk_overlap=40),
+        HashingEmbedder(),
+        NumpyVectorStore(),
+        ExtractiveQuestionGenerator(),
+        ExtractiveAnswerGenerator(),
+        F1Evaluator(),
+    )
+    assert len(output["results"]) == 6
+    # Retrieval finds the sentence each question was made from
+    assert all(result["score"] == 1.0 for result in output["results"])
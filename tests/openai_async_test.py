@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from docqa_bench import (
+    AsyncClientConfig,
+    AsyncOpenAIAnswerGenerator,
+    AsyncOpenAIEmbedder,
+    AsyncOpenAIQuestionGenerator,
+    RateLimiter,
+    RetryPolicy,
+)
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers the embeddings and chat completions endpoints with canned data."""
+
+    rate_limited_requests = 0
+    embedding_requests = []
+    # Inputs whose request fails once with a transient error
+    flaky_inputs = set()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if StubOpenAIHandler.rate_limited_requests > 0:
+            StubOpenAIHandler.rate_limited_requests -= 1
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode()
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if self.path.endswith("/embeddings"):
+            inputs = request["input"]
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            StubOpenAIHandler.embedding_requests.append(inputs)
+            flaky = StubOpenAIHandler.flaky_inputs.intersection(inputs)
+            if flaky:
+                StubOpenAIHandler.flaky_inputs -= flaky
+                payload = json.dumps({"error": {"message": "Overloaded", "type": "server_error"}}).encode()
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            if "invalid" in inputs:
+                payload = json.dumps({"error": {"message": "Invalid input", "type": "invalid_request_error"}}).encode()
+                self.send_response(400)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            body = {
+                "object": "list",
+                "model": request["model"],
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+                    for i, text in enumerate(inputs)
+                ],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        else:
+            body = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "First?\nSecond?"},
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def client_config():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield AsyncClientConfig(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        api_key="test-key",
+        max_connections=4,
+    )
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_async_openai_embedder(client_config):
+    embedder = AsyncOpenAIEmbedder(client_config=client_config)
+    assert await embedder.embed("abc") == [3.0, 1.0]
+    assert await embedder.embed_batch(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_async_openai_generators_share_client(client_config):
+    question_generator = AsyncOpenAIQuestionGenerator(client_config=client_config)
+    answer_generator = AsyncOpenAIAnswerGenerator(client_config=client_config)
+    assert question_generator.client is answer_generator.client
+    assert await question_generator.generate("context", n=2) == ["First?", "Second?"]
+    assert await answer_generator.generate("question", "context") == "First?\nSecond?"
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_honours_rate_limits(client_config):
+    StubOpenAIHandler.rate_limited_requests = 2
+    rate_limiter = RateLimiter(requests_per_minute=6000)
+    embedder = AsyncOpenAIEmbedder(
+        client_config=client_config,
+        rate_limiter=rate_limiter,
+        retry_policy=RetryPolicy(max_retries=3, initial_delay=0.01),
+    )
+    assert await embedder.embed("abc") == [3.0, 1.0]
+    assert StubOpenAIHandler.rate_limited_requests == 0
+    assert rate_limiter.rate_scale < 1.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_enforces_token_budget():
+    rate_limiter = RateLimiter(tokens_per_minute=600)
+    start = time.monotonic()
+    await rate_limiter.acquire(600)
+    await rate_limiter.acquire(5)
+    # The bucket refills at 10 tokens per second
+    assert time.monotonic() - start >= 0.4
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_splits_into_sub_batches(client_config):
+    StubOpenAIHandler.embedding_requests = []
+    embedder = AsyncOpenAIEmbedder(
+        client_config=client_config,
+        max_batch_size=3,
+        max_batch_tokens=4,
+        token_counter=len,
+    )
+    texts = ["a", "bb", "c", "d", "eeee", "f", "invalid", "g"]
+    embeddings = await embedder.embed_batch(texts)
+    assert sorted(StubOpenAIHandler.embedding_requests) == sorted(
+        [["a", "bb", "c"], ["d"], ["eeee"], ["f"], ["invalid"], ["g"]]
+    )
+    # Results keep input order and only the failed sub-batch is empty
+    assert embeddings == [[float(len(text)), 1.0] if text != "invalid" else [] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_retries_only_failed_sub_batch(client_config):
+    StubOpenAIHandler.embedding_requests = []
+    StubOpenAIHandler.flaky_inputs = {"flaky"}
+    embedder = AsyncOpenAIEmbedder(client_config=client_config, max_batch_size=2,
+                                   retry_policy=RetryPolicy(max_retries=3, initial_delay=0.01))
+    texts = ["a", "bb", "flaky", "c", "dd"]
+    embeddings = await embedder.embed_batch(texts)
+    assert embeddings == [[float(len(text)), 1.0] for text in texts]
+    assert sorted(StubOpenAIHandler.embedding_requests) == sorted(
+        [["a", "bb"], ["flaky", "c"], ["flaky", "c"], ["dd"]]
+    )
+
+
+def test_client_config_repr_hides_api_key():
+    config = AsyncClientConfig(api_key="sk-secret")
+    assert "sk-secret" not in repr(config)
+    assert config == AsyncClientConfig(api_key="sk-secret") != AsyncClientConfig(api_key="sk-other")
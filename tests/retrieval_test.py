@@ -0,0 +1,95 @@
+import string
+import pytest
+from docqa_bench import (
+    BaseQuestionGenerator,
+    Benchmark,
+    CorpusBenchmark,
+    F1Evaluator,
+    NumpyVectorStore,
+    PreprocessedDocument,
+    SimpleChunker,
+)
+from docqa_bench.metrics.retrieval import retrieval_metrics
+from conftest import StubEmbedder
+
+TEXT = "\n\n".join(f"Paragraph {letter} talks about {letter * 3} and {letter * 5} only."
+                   for letter in string.ascii_lowercase)
+
+
+def _letter_vector(text):
+    return [float(text.count(letter)) for letter in string.ascii_lowercase]
+
+
+class _EchoQuestionGenerator(BaseQuestionGenerator):
+    """Asks the chunk itself, so its source chunk is the nearest neighbour."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, context, n):
+        self.calls += 1
+        return [context] * n
+
+
+class _NoAnswers:
+    async def generate(self, question, context):
+        raise AssertionError("retrieval-only runs must not generate answers")
+
+
+def test_retrieval_metrics():
+    metrics = retrieval_metrics([["a", "b", "c"], ["x", "a", "y"], ["x", "y", "z"]],
+                                [{"a"}, {"a"}, {"a"}], k=3)
+    assert metrics["recall@k"] == pytest.approx(2 / 3)
+    assert metrics["mrr"] == pytest.approx((1 + 0.5) / 3)
+    assert metrics["ndcg@k"] == pytest.approx((1 + 1 / 1.5849625) / 3)
+    # Results beyond k do not count
+    assert retrieval_metrics([["x", "a"]], [{"a"}], k=1)["recall@k"] == 0.0
+    # Two relevant ids, one found at rank 2
+    assert retrieval_metrics([["x", "a"]], [{"a", "b"}], k=2)["recall@k"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_benchmark_run_retrieval():
+    question_generator = _EchoQuestionGenerator()
+    benchmark = Benchmark(
+        PreprocessedDocument(TEXT),
+        SimpleChunker(chunk_size=60, chunk_overlap=0),
+        StubEmbedder(_letter_vector),
+        NumpyVectorStore(),
+        question_generator,
+        _NoAnswers(),
+        F1Evaluator(),
+    )
+    output = await benchmark.run_retrieval(k=3, num_chunks=5, questions_per_chunk=2)
+
+    assert question_generator.calls == 5
+    assert len(output["results"]) == 10
+    assert all(result["rank"] == 1 for result in output["results"])
+    assert output["metrics"]["recall@k"] == 1.0
+    assert output["metrics"]["mrr"] == 1.0
+    assert output["metrics"]["num_questions"] == 10
+
+    # Reusing the question set skips ingestion and question generation
+    questions = [{k: v for k, v in result.items() if k in ("question", "chunk_id", "metadata")}
+                 for result in output["results"]]
+    again = await benchmark.run_retrieval(k=1, questions=questions, ingest=False)
+    assert question_generator.calls == 5
+    assert again["metrics"]["ndcg@k"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_corpus_benchmark_run_retrieval():
+    documents = [PreprocessedDocument(TEXT[:400]), PreprocessedDocument(TEXT[400:])]
+    benchmark = CorpusBenchmark(
+        documents,
+        SimpleChunker(chunk_size=60, chunk_overlap=0),
+        StubEmbedder(_letter_vector),
+        NumpyVectorStore(),
+        _EchoQuestionGenerator(),
+        _NoAnswers(),
+        F1Evaluator(),
+        processes=0,
+    )
+    output = await benchmark.run_retrieval(k=3, num_chunks=6)
+    assert {result["metadata"]["document_id"] for result in output["results"]} == {"doc_0", "doc_1"}
+    assert output["metrics"]["recall@k"] == 1.0
@@ -0,0 +1,120 @@
+import pytest
+from docqa_bench import (
+    ExtractiveAnswerGenerator,
+    ExtractiveQuestionGenerator,
+    F1Evaluator,
+    HashingEmbedder,
+    PreprocessedDocument,
+    ReferenceAnswerStore,
+    Sweep,
+)
+from conftest import StubEmbedder
+
+TEXT = " ".join(
+    f"Sentence number {i} says that item {i} is stored in box {i * 7 % 13}." for i in range(40)
+)
+
+
+def CountingEmbedder(dimension: int):
+    hashing = HashingEmbedder(dimension=dimension)
+    return StubEmbedder(lambda text: hashing.embed_array([text])[0].tolist(), model=hashing.model)
+
+
+class CountingAnswerGenerator(ExtractiveAnswerGenerator):
+    def __init__(self, model: str):
+        super().__init__()
+        self.model = model
+        self.calls = 0
+
+    async def generate(self, question, context):
+        self.calls += 1
+        return await super().generate(question, context)
+
+
+class CountingQuestionGenerator(ExtractiveQuestionGenerator):
+    calls = 0
+
+    async def generate(self, context, n):
+        self.calls += 1
+        return await super().generate(context, n)
+
+
+@pytest.mark.asyncio
+async def test_sweep_shares_work_between_configs():
+    embedders = {"small": CountingEmbedder(64), "large": CountingEmbedder(256)}
+    answer_generators = {"a": CountingAnswerGenerator("a"), "b": CountingAnswerGenerator("b")}
+    question_generator = CountingQuestionGenerator()
+    reference_store = ReferenceAnswerStore()
+    sweep = Sweep(
+        PreprocessedDocument(TEXT),
+        embedders,
+        question_generator,
+        answer_generators,
+        F1Evaluator(),
+        reference_store=reference_store,
+        num_questions=5,
+        max_concurrency=3,
+    )
+    grid = {"chunk_size": [100, 300], "chunk_overlap": [0, 150], "k": [1, 2, 3]}
+    rows = await sweep.run(grid)
+
+    # (100, 150) is not a valid chunking
+    assert len(rows) == 3 * 2 * 3 * 2
+    assert [row["config"] for row in rows] == sweep.configs(grid)
+    assert question_generator.calls == 1
+    assert all(row["metrics"]["num_questions"] == 5 for row in rows)
+    assert {row["results"][0]["question"] for row in rows} == {sweep.questions[0]}
+
+    timings = sweep.telemetry.summary()
+    assert timings["chunking"]["count"] == 3
+    assert timings["ingest"]["count"] == 3 * 2
+    assert timings["question_embedding"]["count"] == 2
+    assert timings["search"]["count"] == 3 * 2 * 3
+    # Each chunk is embedded once per embedder, each question once more
+    num_chunks = sum(row["metrics"]["num_chunks"] for row in rows
+                     if row["config"]["embedder"] == "small"
+                     and row["config"]["k"] == 1 and row["config"]["answer_generator"] == "a")
+    assert len(embedders["small"].texts) == num_chunks + 5
+    # Reference answers depend only on the question and the answering model
+    assert len(reference_store) == 2 * 5
+    assert timings["reference_answer"]["count"] == 2 * 5
+    assert answer_generators["a"].calls == timings["answer_generation"]["count"] // 2 + 5
+
+    table = Sweep.table(rows).splitlines()
+    assert table[0].split() == ["chunk_size", "chunk_overlap", "embedder", "k", "answer_generator",
+                                "mean_score", "num_questions", "num_chunks"]
+    assert len(table) == len(rows) + 1
+    scores = [float(line.split()[5]) for line in table[1:]]
+    assert scores == sorted(scores, reverse=True)
+
+    # Extending the grid only runs the new configurations' work
+    await sweep.run({**grid, "k": [1, 5]})
+    timings = sweep.telemetry.summary()
+    assert "chunking" not in timings and "ingest" not in timings
+    assert timings["search"]["count"] == 3 * 2
+    assert question_generator.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_answers_identical_contexts_once():
+    answer_generator = CountingAnswerGenerator("a")
+    sweep = Sweep(PreprocessedDocument(TEXT), {"hashing": HashingEmbedder()},
+                  ExtractiveQuestionGenerator(), {"a": answer_generator}, F1Evaluator(),
+                  num_questions=4)
+    # The whole text fits in one chunk, so every k retrieves the same context
+    rows = await sweep.run({"chunk_size": [10_000], "k": [1, 2, 3]})
+    assert len(rows) == 3
+    assert answer_generator.calls == 4 + 4
+    assert rows[0]["results"] == rows[2]["results"]
+
+
+def test_sweep_rejects_unknown_parameters():
+    sweep = Sweep(PreprocessedDocument(TEXT), {"hashing": HashingEmbedder()},
+                  ExtractiveQuestionGenerator(), {"extractive": ExtractiveAnswerGenerator()},
+                  F1Evaluator())
+    with pytest.raises(ValueError):
+        sweep.configs({"temperature": [0.0]})
+    with pytest.raises(ValueError):
+        sweep.configs({"embedder": ["openai"]})
+    assert sweep.configs({}) == [{"chunk_size": 1000, "chunk_overlap": 200, "embedder": "hashing",
+                                  "k": 3, "answer_generator": "extractive"}]
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from docqa_bench import (
+    BaseAnswerGenerator,
+    Benchmark,
+    ExtractiveQuestionGenerator,
+    F1Evaluator,
+    HashingEmbedder,
+    NumpyVectorStore,
+    SimpleChunker,
+)
+from docqa_bench.telemetry import Telemetry, record_usage
+
+TEXT = ("The quick brown fox jumps over the lazy dog. Cats sleep for most of the day. "
+        "Error code E1234 means that the disk is full. Paris is the capital of France.")
+
+
+class _MeteredAnswerGenerator(BaseAnswerGenerator):
+    """Reports usage like an OpenAI response would."""
+
+    model = "gpt-4o-mini"
+
+    async def generate(self, question, context):
+        record_usage(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=100, completion_tokens=10)))
+        return question
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_stage_timings_tokens_and_cost():
+    output = await Benchmark.evaluate_scraped_content(
+        TEXT,
+        SimpleChunker(chunk_size=50, chunk_overlap=0),
+        HashingEmbedder(),
+        NumpyVectorStore(),
+        ExtractiveQuestionGenerator(),
+        _MeteredAnswerGenerator(),
+        F1Evaluator(),
+    )
+    results = output["results"]
+    assert len(results) == 4
+    for result in results:
+        assert set(result["timings"]) == {"answer_generation", "reference_answer"}
+        assert result["tokens"] == {"input": 200, "output": 20}
+        assert result["cost"] == pytest.approx((200 * 0.15 + 20 * 0.60) / 1e6)
+
+    metadata = output["metadata"]
+    assert {"run", "ingest", "chunking", "embedding", "store", "question_generation",
+            "question_embedding", "search", "answer_generation", "reference_answer",
+            "evaluation"} <= set(metadata["timings"])
+    for timing in metadata["timings"].values():
+        assert 0 <= timing["p50"] <= timing["p95"] <= timing["p99"]
+    assert metadata["timings"]["answer_generation"]["count"] == 4
+    assert metadata["tokens"] == {"input": 800, "output": 80}
+    assert metadata["cost"]["total"] == pytest.approx(sum(result["cost"] for result in results))
+    assert metadata["throughput"]["questions_per_second"] > 0
+    assert metadata["throughput"]["chunks_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_telemetry_emits_spans():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    telemetry = Telemetry(tracer_provider=provider)
+
+    with telemetry.stage("outer"):
+        with telemetry.stage("inner", chunks=3) as usage:
+            record_usage(SimpleNamespace(usage=SimpleNamespace(prompt_tokens=5, completion_tokens=None)))
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["inner"].parent.span_id == spans["outer"].context.span_id
+    assert spans["inner"].attributes["chunks"] == 3
+    assert spans["inner"].attributes["tokens.input"] == 5
+    assert usage.input_tokens == 5
+    # Usage belongs to the innermost stage only
+    assert telemetry.usage["outer"].input_tokens == 0
+    assert telemetry.total_usage().input_tokens == 5
@@ -0,0 +1,226 @@
+import numpy as np
+import pytest
+from docqa_bench import HybridStore, IVFVectorStore, NumpyVectorStore
+from conftest import StubEmbedder
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+
+
+def exact_neighbours(vectors, queries, metric, k):
+    if metric == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    if metric == "l2":
+        distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(-1)
+    else:
+        distances = -(queries @ vectors.T)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("metric", ["cosine", "dot", "l2"])
+async def test_numpy_store_matches_brute_force(vectors, metric):
+    store = NumpyVectorStore(metric=metric, initial_capacity=4)
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    await store.add_many(ids, vectors.tolist(), [{"text": id} for id in ids], batch_size=7)
+    assert await store.count() == len(vectors)
+
+    queries = vectors[:5] + 0.01
+    results = await store.search_batch(queries.tolist(), k=3)
+    expected = exact_neighbours(vectors, queries, metric, 3)
+    assert [[r["id"] for r in result] for result in results] == [
+        [f"chunk_{i}" for i in row] for row in expected
+    ]
+    assert all(result[0]["score"] <= result[-1]["score"] for result in results)
+    assert await store.search(queries[0].tolist(), k=3) == results[0]
+
+
+@pytest.mark.asyncio
+async def test_numpy_store_replaces_existing_ids():
+    store = NumpyVectorStore()
+    await store.add("a", [1.0, 0.0], {"text": "old"})
+    await store.add("a", [0.0, 1.0], {"text": "new"})
+    assert await store.count() == 1
+    result = await store.search([0.0, 1.0], k=5)
+    assert result[0]["metadata"]["text"] == "new"
+    assert result[0]["score"] == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_ivf_store_recall_and_persistence(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(16, 8))
+    vectors = (centers[rng.integers(0, 16, 2000)] + 0.1 * rng.normal(size=(2000, 8))).astype(np.float32)
+    store = IVFVectorStore(nlist=16, nprobe=4, min_points_per_centroid=10)
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    await store.add_many(ids, vectors.tolist(), [{"text": id} for id in ids])
+
+    queries = vectors[:50] + 0.01
+    results = await store.search_batch(queries.tolist(), k=5)
+    assert store.is_trained
+    assert all(len(result) == 5 for result in results)
+    metrics = store.recall_at_k(queries.tolist(), k=5)
+    assert metrics["recall"] > 0.9
+
+    # Vectors added after training are searchable
+    await store.add("new", (vectors[0] * 3).tolist(), {"text": "new"})
+    assert (await store.search((vectors[0] * 3).tolist(), k=1))[0]["id"] == "new"
+
+    path = str(tmp_path / "index.npz")
+    store.save(path)
+    loaded = IVFVectorStore.load(path)
+    assert await loaded.count() == await store.count()
+    assert loaded.is_trained
+    assert [[r["id"] for r in result] for result in await loaded.search_batch(queries.tolist(), k=5)] == [
+        [r["id"] for r in result] for result in await store.search_batch(queries.tolist(), k=5)
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+async def test_hybrid_store_fuses_keyword_and_dense(fusion):
+    store = HybridStore(NumpyVectorStore(), fusion=fusion)
+    texts = {
+        "fox": "The quick brown fox jumps over the lazy dog",
+        "cat": "A cat sleeps all day",
+        "code": "Error code E1234 means the disk is full",
+    }
+    # The dense vectors put the question closest to "cat"
+    vectors = {"fox": [1.0, 0.0], "cat": [0.0, 1.0], "code": [0.7, 0.7]}
+    await store.add_many(list(texts), list(vectors.values()), [{"text": t} for t in texts.values()])
+    assert await store.count() == 3
+
+    query = [0.1, 1.0]
+    dense_only = await store.search_batch([query], k=1)
+    assert dense_only[0][0]["id"] == "cat"
+    # The exact keyword match wins once the query text is used
+    hybrid = await store.search_batch([query, query], k=2, query_texts=["what does E1234 mean", "cat"])
+    assert hybrid[0][0]["id"] == "code"
+    assert hybrid[0][0]["metadata"]["text"] == texts["code"]
+    assert hybrid[1][0]["id"] == "cat"
+    assert (await store.search(query, k=1, query_text="E1234"))[0]["id"] == "code"
+
+
+def test_hybrid_store_bm25_updates_incrementally():
+    store = HybridStore(NumpyVectorStore())
+    store.index_texts(["a", "b"], [{"text": "apple banana apple"}, {"text": "banana cherry"}])
+    rows = store.keyword_search_batch(["apple", "banana", "durian"], k=5)
+    assert [store._ids[row] for row, _ in rows[0]] == ["a"]
+    assert {store._ids[row] for row, _ in rows[1]} == {"a", "b"}
+    assert rows[2] == []
+
+    # Re-indexing an id replaces its old text
+    store.index_texts(["a"], [{"text": "durian"}])
+    rows = store.keyword_search_batch(["apple", "durian"], k=5)
+    assert rows[0] == []
+    assert [store._ids[row] for row, _ in rows[1]] == ["a"]
+
+
+def test_hybrid_store_bm25_ignores_and_compacts_tombstones():
+    store = HybridStore(NumpyVectorStore())
+    texts = [{"text": "apple banana"}, {"text": "banana cherry"}, {"text": "cherry durian"}]
+    store.index_texts(["a", "b", "c"], texts)
+
+    def search():
+        return [(store._ids[row], score)
+                for row, score in store.keyword_search_batch(["apple banana"], k=3)[0]]
+
+    expected = search()
+
+    # Re-indexing unchanged texts leaves the scores and the index size unchanged
+    for _ in range(200):
+        store.index_texts(["a", "b"], texts[:2])
+    result = search()
+    assert [id for id, _ in result] == [id for id, _ in expected] == ["a", "b"]
+    assert [score for _, score in result] == pytest.approx([score for _, score in expected])
+    assert len(store._ids) <= 4
+    assert sum(len(rows) for rows, _ in store._postings.values()) <= 8
+
+
+@pytest.mark.asyncio
+async def test_hybrid_store_indexes_documents_of_wrapped_store():
+    from docqa_bench.ingestion import sync_batches
+    dense_store = NumpyVectorStore()
+    await dense_store.add_many(["a", "stale"], [[1.0, 0.0], [0.0, 1.0]],
+                               [{"text": "apple pie"}, {"text": "stale bread"}])
+
+    # Keyword searches see the texts the dense store already held
+    store = HybridStore(dense_store)
+    results = await store.search_batch([[0.0, 1.0]], k=1, query_texts=["apple"])
+    assert results[0][0]["id"] == "a"
+
+    # Incremental sync treats them as stored, so it keeps "a" and deletes "stale"
+    store = HybridStore(dense_store)
+    assert sorted(await store.ids()) == ["a", "stale"]
+    records = [("a", "apple pie", {"text": "apple pie"})]
+
+    async def iterate():
+        for record in records:
+            yield record
+
+    changes = await sync_batches(iterate(), StubEmbedder(), store)
+    assert changes == {"added": 0, "deleted": 1, "unchanged": 1, "failed": 0}
+    assert await dense_store.ids() == ["a"]
+    assert store.keyword_search_batch(["stale"], k=1) == [[]]
+
+
+def _chroma_store():
+    import uuid
+    from docqa_bench import ChromaStore
+    return ChromaStore(f"test_collection_{uuid.uuid4().hex}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("make_store", [
+    NumpyVectorStore,
+    lambda: IVFVectorStore(nlist=4, nprobe=4, min_points_per_centroid=5),
+    lambda: HybridStore(NumpyVectorStore()),
+    _chroma_store,
+])
+async def test_stores_delete_ids(vectors, make_store):
+    store = make_store()
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    await store.add_many(ids, vectors.tolist(), [{"text": f"text {id}"} for id in ids])
+    await store.search(vectors[0].tolist(), k=1)
+
+    deleted = [f"chunk_{i}" for i in range(0, len(vectors), 3)]
+    assert await store.delete(deleted + ["missing"]) == len(deleted)
+    assert sorted(await store.ids()) == sorted(set(ids) - set(deleted))
+    assert await store.count() == len(vectors) - len(deleted)
+    assert await store.metadatas(["chunk_1", "chunk_0"]) == [{"text": "text chunk_1"}, None]
+
+    # Deleted documents are never returned; the remaining ones are still found
+    results = await store.search_batch(vectors[:6].tolist(), k=len(vectors))
+    assert not {r["id"] for result in results for r in result} & set(deleted)
+    assert (await store.search(vectors[1].tolist(), k=1))[0]["id"] == "chunk_1"
+    if isinstance(store, HybridStore):
+        keyword = await store.search_batch([vectors[3].tolist()], k=3, query_texts=["chunk_3"])
+        assert "chunk_3" not in [r["id"] for r in keyword[0]]
+
+    # Deleted ids can be added again
+    await store.add("chunk_0", vectors[0].tolist(), {"text": "text chunk_0"})
+    assert (await store.search(vectors[0].tolist(), k=1))[0]["id"] == "chunk_0"
+
+
+@pytest.mark.asyncio
+async def test_persistent_chroma_store_reattaches(tmp_path, vectors):
+    from docqa_bench import ChromaStore
+    path = str(tmp_path / "chroma")
+    store = ChromaStore("documents", path=path)
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    await store.add_many(ids, vectors.tolist(), [{"text": id} for id in ids])
+    assert await store.get_manifest() is None
+    await store.set_manifest({"embedding_model": "test"})
+
+    # Reusing the name attaches to the same collection instead of failing
+    reopened = ChromaStore("documents", path=path)
+    assert await reopened.count() == len(vectors)
+    assert await reopened.get_manifest() == {"embedding_model": "test", "dimension": 8}
+    # Re-adding an id replaces it
+    await reopened.add("chunk_0", vectors[1].tolist(), {"text": "replaced"})
+    assert await reopened.count() == len(vectors)
+    results = {r["id"]: r["metadata"]["text"] for r in await reopened.search(vectors[1].tolist(), k=2)}
+    assert results == {"chunk_0": "replaced", "chunk_1": "chunk_1"}